@@ -80,11 +80,11 @@ def process_single_image(
     if ocr_engine is not None:
         try:
             ocr_result = ocr_engine.extract_with_regions(image, sample)
-            extracted_fields = ocr_result.extracted_fields
+            extracted_fields = ocr_result.details["extracted_fields"]
             result["stages"]["ocr"] = {
                 "num_fields_extracted": len(extracted_fields),
                 "fields": {k: v[:50] for k, v in extracted_fields.items()},
-                "confidence": ocr_result.confidence,
+                "confidence": ocr_result.avg_confidence,
             }
         except Exception as e:
             result["stages"]["ocr"] = {"error": str(e)}
@@ -110,22 +110,23 @@ def process_single_image(
             def __init__(self, fields):
                 self.extracted_fields = fields
 
-        rules_result = rules_engine.apply(FieldHolder(extracted_fields))
+        # Only serialized to JSON: apply_raw skips the RuleViolation objects
+        rules_result = rules_engine.apply_raw(FieldHolder(extracted_fields))
         result["stages"]["rules"] = {
-            "risk_score": rules_result.risk_score,
-            "risk_level": rules_result.risk_level,
-            "rules_total": rules_result.rules_total,
-            "rules_passed": rules_result.rules_passed,
-            "rules_failed": rules_result.rules_failed,
-            "num_violations": len(rules_result.violations),
+            "risk_score": rules_result["risk_score"],
+            "risk_level": rules_result["risk_level"],
+            "rules_total": rules_result["rules_total"],
+            "rules_passed": rules_result["rules_passed"],
+            "rules_failed": rules_result["rules_failed"],
+            "num_violations": len(rules_result["violations"]),
             "violations": [
                 {
-                    "rule_id": v.rule_id,
-                    "rule_name": v.rule_name,
-                    "severity": v.severity,
-                    "detail": v.detail,
+                    "rule_id": rule_id,
+                    "rule_name": rule_name,
+                    "severity": severity,
+                    "detail": detail,
                 }
-                for v in rules_result.violations
+                for rule_id, rule_name, severity, detail in rules_result["violations"]
             ],
         }
     except Exception as e:
@@ -166,6 +167,12 @@ def main():
     parser.add_argument("--split", default="train", choices=["train", "valid", "test"])
     parser.add_argument("--limit", type=int, default=0, help="Limit images (0=all)")
     parser.add_argument("--no-ocr", action="store_true", help="Skip OCR (faster)")
+    parser.add_argument("--gpu", action="store_true", help="Run OCR on GPU (batched field crops)")
+    parser.add_argument("--ocr-backend", default="paddle", choices=["paddle", "onnx"],
+                        help="OCR inference backend (falls back to paddle if unavailable)")
+    parser.add_argument("--onnx-model-dir", default=None, help="Dir with det/rec/cls.onnx (onnx backend)")
+    parser.add_argument("--gpu-mem-mb", type=int, default=None,
+                        help="Initial Paddle GPU memory pool in MB (default: Paddle's)")
     parser.add_argument("--output", default="data/results", help="Output directory")
     args = parser.parse_args()
 
@@ -196,7 +203,11 @@ def main():
     if not args.no_ocr:
         try:
             from src.infrastructure.ocr.passport_ocr_engine import PassportOCREngine
-            ocr_engine = PassportOCREngine(lang="en", use_gpu=False)
+            ocr_engine = PassportOCREngine(
+                lang="en", use_gpu=args.gpu,
+                backend=args.ocr_backend, onnx_model_dir=args.onnx_model_dir,
+                gpu_mem_mb=args.gpu_mem_mb,
+            )
             print("  → Passport OCR Engine: OK")
         except Exception as e:
             print(f"  → Passport OCR Engine: FAILED ({e}), continuing without OCR")
@@ -212,28 +223,33 @@ def main():
     decisions = {"APPROVED": 0, "SUSPICIOUS": 0, "REVIEW": 0, "REJECTED_QUALITY": 0}
     total_time = 0
 
-    for i, sample in enumerate(samples):
-        image_path = os.path.join(dataset.base_dir, sample.file_name)
-
-        result = process_single_image(
-            image_path, sample, quality_gate, rules_engine, ocr_engine
-        )
-        results.append(result)
-
-        decision = result.get("decision", "ERROR")
-        decisions[decision] = decisions.get(decision, 0) + 1
-        total_time += result.get("total_time_ms", 0)
-
-        # Progress
-        if (i + 1) % 10 == 0 or (i + 1) == len(samples):
-            pct = (i + 1) / len(samples) * 100
-            avg_ms = total_time / (i + 1)
-            print(f"  [{i+1:4d}/{len(samples)}] {pct:5.1f}% | "
-                  f"avg {avg_ms:.0f}ms/img | "
-                  f"✓{decisions['APPROVED']} "
-                  f"?{decisions['SUSPICIOUS']} "
-                  f"⚠{decisions['REVIEW']} "
-                  f"✗{decisions['REJECTED_QUALITY']}")
+    try:
+        for i, sample in enumerate(samples):
+            image_path = os.path.join(dataset.base_dir, sample.file_name)
+
+            result = process_single_image(
+                image_path, sample, quality_gate, rules_engine, ocr_engine
+            )
+            results.append(result)
+
+            decision = result.get("decision", "ERROR")
+            decisions[decision] = decisions.get(decision, 0) + 1
+            total_time += result.get("total_time_ms", 0)
+
+            # Progress
+            if (i + 1) % 10 == 0 or (i + 1) == len(samples):
+                pct = (i + 1) / len(samples) * 100
+                avg_ms = total_time / (i + 1)
+                print(f"  [{i+1:4d}/{len(samples)}] {pct:5.1f}% | "
+                      f"avg {avg_ms:.0f}ms/img | "
+                      f"✓{decisions['APPROVED']} "
+                      f"?{decisions['SUSPICIOUS']} "
+                      f"⚠{decisions['REVIEW']} "
+                      f"✗{decisions['REJECTED_QUALITY']}")
+    finally:
+        # Release the OCR worker processes
+        if ocr_engine is not None:
+            ocr_engine.close()
 
     # ── Save results ──
     print(f"\n[4/4] Saving results...")
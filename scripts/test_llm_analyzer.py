@@ -75,6 +75,7 @@ for label, data in [("REAL PASSPORT", real_passport), ("FRAUD PASSPORT", fraud_p
         rules_violations=violations,
         risk_score=rules_result.risk_score,
         risk_level=rules_result.risk_level,
+        force_llm=True,  # exercise Gemini even for clear-cut rules verdicts
     )
 
     if result.error:
@@ -8,11 +8,13 @@ Architecture:
   - PaddleOCR v5 + EasyOCR hybrid engine
 """
 
+import asyncio
 import os
 import time
 import uuid
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -23,7 +25,7 @@ from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
-from src.api.routes.analyze import router as analyze_router
+from src.api.routes.analyze import router as analyze_router, warm_up as warm_up_pipeline
 from src.config.settings import get_settings
 from src.infrastructure.db.database import init_db, get_db
 from src.infrastructure.db.repository import CaseRepository
@@ -47,6 +49,9 @@ app.add_middleware(
 # ── Singletons ──
 case_repo = CaseRepository()
 _rag_engine = None
+# Per-case embedding runs off the request path; calls are I/O-bound (RPC + DB,
+# one session per get_db), so several overlap safely
+_embed_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="embed")
 
 API_PASSWORD = os.getenv("API_PASSWORD", "admin")
 API_KEY = os.getenv("API_KEY", "bayes-fraud-doc-2024")
@@ -69,11 +74,14 @@ def get_rag_engine():
 # ── Startup ──
 @app.on_event("startup")
 async def startup():
-    """Initialize DB and load demo cases."""
+    """Initialize DB, load demo cases and warm up the OCR pipeline."""
     init_db()
     _load_demo_cases()
     # Embed demo cases in background
     _embed_existing_cases()
+    if get_settings().ocr_warmup:
+        # Multi-second model load: keep it off the event loop
+        await asyncio.to_thread(warm_up_pipeline)
     logger.info("Fraud-Doc Pipeline started")
 
 
@@ -129,15 +137,21 @@ def store_case(result_dict: dict):
     # Save to DB
     record = case_repo.save(result_dict)
 
-    # Generate embedding async-style (in-thread for now)
+    # Generate embedding in the background pool
     try:
         rag = get_rag_engine()
         if rag:
-            rag.embed_case(record.case_id)
+            future = _embed_pool.submit(rag.embed_case, record.case_id)
+            future.add_done_callback(lambda f, cid=record.case_id: _log_embed_error(f, cid))
     except Exception as e:
         logger.warning(f"Embedding failed for {record.case_id}: {e}")
 
 
+def _log_embed_error(future, case_id: str):
+    if future.exception() is not None:
+        logger.warning(f"Embedding failed for {case_id}: {future.exception()}")
+
+
 # ── RAG Chat ──
 class ChatRequest(BaseModel):
     message: str
@@ -157,7 +171,7 @@ async def chat_with_llm(req: ChatRequest):
     if not rag:
         return ChatResponse(reply="LLM not configured. Set GEMINI_API_KEY in .env", model="none")
 
-    result = rag.chat(message=req.message, context_case_ids=req.context_case_ids)
+    result = await rag.chat_async(message=req.message, context_case_ids=req.context_case_ids)
 
     return ChatResponse(
         reply=result.get("reply", ""),
@@ -328,13 +342,13 @@ def _load_demo_cases():
         },
     ]
 
-    for demo in demos:
-        try:
-            case_repo.save(demo)
-        except Exception as e:
-            logger.warning(f"Failed to save demo case: {e}")
+    try:
+        saved = case_repo.save_many(demos)
+    except Exception as e:
+        logger.warning(f"Failed to save demo cases: {e}")
+        return
 
-    logger.info(f"Loaded {len(demos)} demo cases into DB")
+    logger.info(f"Loaded {saved} demo cases into DB")
 
 
 def _embed_existing_cases():
@@ -41,16 +41,26 @@ def _get_use_case() -> AnalyzeDocumentUseCase:
                 brightness_max=settings.brightness_max,
                 min_resolution=settings.min_resolution,
                 min_doc_area_ratio=settings.min_doc_area_ratio,
+                analysis_max_side=settings.quality_analysis_max_side,
             ),
             ocr_engine=HybridOCREngine(
                 lang=settings.ocr_lang,
                 use_gpu=settings.ocr_use_gpu,
+                warmup=settings.ocr_warmup,
+                fp16=settings.ocr_fp16,
+                use_tensorrt=settings.ocr_use_tensorrt,
+                int8_rec=settings.ocr_int8_rec,
             ),
             rules_engine=PassportRulesEngine(),
         )
     return _use_case
 
 
+def warm_up():
+    """Build the pipeline eagerly (loads OCR models) so the first request is not a cold start."""
+    _get_use_case()
+
+
 def _get_llm() -> LLMFraudAnalyzer | None:
     """Get LLM analyzer if enabled."""
     global _llm_analyzer
@@ -61,6 +71,8 @@ def _get_llm() -> LLMFraudAnalyzer | None:
         _llm_analyzer = LLMFraudAnalyzer(
             api_key=settings.gemini_api_key,
             model_name=settings.gemini_model,
+            fast_model=settings.gemini_fast_model,
+            cache_ttl_seconds=settings.llm_cache_ttl_seconds,
         )
     return _llm_analyzer
 
@@ -173,6 +185,7 @@ async def analyze_document(request: Request, file: UploadFile = File(...)):
             risk_score=result.rules.risk_score,
             risk_level=result.rules.risk_level,
             rules_version=result.rules.rules_version,
+            rules_skipped=result.rules.rules_skipped,
         )
 
     # Add LLM to response
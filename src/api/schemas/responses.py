@@ -43,6 +43,7 @@ class RulesResponse(BaseModel):
     risk_score: float
     risk_level: str
     rules_version: str
+    rules_skipped: int = 0
 
 
 class FraudResponse(BaseModel):
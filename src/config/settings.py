@@ -23,11 +23,16 @@ class Settings(BaseSettings):
     brightness_max: int = 220
     min_resolution: int = 640
     min_doc_area_ratio: float = 0.05
+    quality_analysis_max_side: int = 0   # >0: run CV metrics on a downscaled copy (recalibrate thresholds)
 
     # --- OCR ---
     ocr_lang: str = "en"
     ocr_use_gpu: bool = False
+    ocr_fp16: bool = True            # half precision when ocr_use_gpu
+    ocr_use_tensorrt: bool = False   # TensorRT subgraphs when ocr_use_gpu
+    ocr_int8_rec: bool = False       # pre-quantized Paddle recognizer (check MRZ accuracy first)
     ocr_min_confidence: float = 0.5
+    ocr_warmup: bool = True          # load OCR models at API startup
 
     # --- Fraud ---
     fraud_model_path: str = "models/weights/efficientnet_b0_fraud.pt"
@@ -36,7 +41,9 @@ class Settings(BaseSettings):
     # --- LLM (Gemini) ---
     gemini_api_key: str = ""
     gemini_model: str = "gemini-2.0-flash"
+    gemini_fast_model: str = "gemini-2.0-flash-lite"   # mid-risk routing; "" disables
     llm_enabled: bool = True
+    llm_cache_ttl_seconds: int = 24 * 3600   # 0 disables the response cache
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8", "extra": "ignore"}
 
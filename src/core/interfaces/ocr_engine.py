@@ -8,6 +8,7 @@ deve implementar este contrato.
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from functools import cached_property
 
 
 @dataclass
@@ -29,6 +30,18 @@ class OCRResult:
     ocr_engine: str = ""          # identificação da engine usada
     details: dict = field(default_factory=dict)
 
+    # Mapas por nome, calculados uma vez por resultado e compartilhados entre
+    # motores de regras. `fields` não deve ser alterado depois do primeiro acesso.
+    @cached_property
+    def field_values(self) -> dict[str, str]:
+        """{nome: valor} dos campos (último vence em nomes repetidos)."""
+        return {f.name: f.value for f in self.fields}
+
+    @cached_property
+    def field_confidences(self) -> dict[str, float]:
+        """{nome: confiança} dos campos."""
+        return {f.name: f.confidence for f in self.fields}
+
 
 class IOCREngine(ABC):
     """
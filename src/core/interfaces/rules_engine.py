@@ -7,17 +7,30 @@ extraídos pelo OCR. Valida formato, consistência e layout.
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from enum import StrEnum
 from src.core.interfaces.ocr_engine import OCRResult
 
 
-@dataclass
+class Severity(StrEnum):
+    """Severidade de uma violação (StrEnum: compara e serializa como a string)."""
+    LOW = "LOW"
+    MEDIUM = "MEDIUM"
+    HIGH = "HIGH"
+    CRITICAL = "CRITICAL"
+
+
+@dataclass(slots=True)
 class RuleViolation:
     """Uma violação de regra detectada."""
     rule_id: str              # ex: "CPF_CHECKSUM"
     rule_name: str            # ex: "Validação de dígitos verificadores do CPF"
-    severity: str             # "LOW", "MEDIUM", "HIGH", "CRITICAL"
+    severity: Severity        # "LOW", "MEDIUM", "HIGH", "CRITICAL"
     detail: str               # ex: "Dígito verificador não bate: esperado 09, encontrado 11"
 
+    def __post_init__(self):
+        # Severidade inválida (typo) falha aqui em vez de cair num peso padrão
+        self.severity = Severity(self.severity)
+
 
 @dataclass
 class RulesResult:
@@ -29,6 +42,7 @@ class RulesResult:
     risk_score: float = 0.0          # 0.0 (limpo) a 1.0 (alto risco)
     risk_level: str = "LOW"          # "LOW", "MEDIUM", "HIGH", "CRITICAL"
     rules_version: str = ""
+    rules_skipped: int = 0           # não avaliadas (risco já saturado em 1.0)
 
 
 class IRulesEngine(ABC):
@@ -0,0 +1 @@
+# Cache — In-process caches for expensive calls (LLM, embeddings)
@@ -0,0 +1,58 @@
+"""
+In-process LRU cache with per-entry time-to-live.
+
+Used to skip repeated remote calls (Gemini generation/embeddings)
+for identical inputs. Thread-safe; no external dependencies.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """LRU-bounded mapping whose entries expire `ttl_seconds` after insertion."""
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing/expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Insert/refresh a value, evicting the least recently used entry if full."""
+        if self.maxsize <= 0 or self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        """Number of live entries (expired ones are purged first)."""
+        with self._lock:
+            # get() refreshes recency but not expiry, so entries are not
+            # ordered by expiry time: scan them all
+            now = time.monotonic()
+            for key in [k for k, (expires_at, _) in self._data.items() if expires_at < now]:
+                del self._data[key]
+            return len(self._data)
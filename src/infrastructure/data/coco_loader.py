@@ -7,7 +7,9 @@ access to each passport field region for OCR + Rules.
 """
 import json
 import os
+import re
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
@@ -136,12 +138,15 @@ class COCODataset:
         }
 
 
+# Second dash-separated token of the filename (the country code)
+_COUNTRY_RE = re.compile(r"^[^-]*-([^-]*)")
+
+
+@lru_cache(maxsize=4096)
 def _extract_country(filename: str) -> str:
     """Extract country code from filename like 'midv2020-aze-passport_01.jpg'."""
-    parts = filename.split("-")
-    if len(parts) >= 2:
-        return parts[1].lower()
-    return "unknown"
+    m = _COUNTRY_RE.match(filename)
+    return m.group(1).lower() if m else "unknown"
 
 
 def load_coco_split(data_dir: str, split: str = "train") -> COCODataset:
@@ -12,7 +12,7 @@ import os
 import logging
 from contextlib import contextmanager
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker, Session
 
 from src.infrastructure.db.models import Base
@@ -38,6 +38,14 @@ def create_db_engine(url: str = None):
             connect_args={"check_same_thread": False},
             echo=False,
         )
+
+        @event.listens_for(engine, "connect")
+        def _set_sqlite_pragma(dbapi_conn, _record):
+            # WAL + NORMAL sync: one fsync per checkpoint instead of per commit
+            cursor = dbapi_conn.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
     else:
         # PostgreSQL
         engine = create_engine(
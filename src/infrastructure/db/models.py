@@ -81,12 +81,17 @@ class CaseRecord(Base):
     @classmethod
     def from_analysis_dict(cls, data: dict) -> "CaseRecord":
         """Create CaseRecord from analysis response dict."""
+        return cls(**cls.mapping_from_analysis_dict(data))
+
+    @staticmethod
+    def mapping_from_analysis_dict(data: dict) -> dict:
+        """Column mapping for an analysis response dict (used by bulk inserts)."""
         quality = data.get("quality") or {}
         ocr = data.get("ocr") or {}
         rules = data.get("rules") or {}
         llm = data.get("llm") or {}
 
-        return cls(
+        return dict(
             case_id=data.get("case_id", str(uuid.uuid4())),
             run_id=data.get("run_id", str(uuid.uuid4())[:8]),
             final_decision=data.get("final_decision", "UNKNOWN"),
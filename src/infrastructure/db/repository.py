@@ -8,26 +8,36 @@ Handles:
 """
 
 import json
-import math
 import logging
-from typing import Optional
+from collections import ChainMap
+from typing import Mapping, Optional
 from datetime import datetime
 
-from sqlalchemy import desc, func
+import numpy as np
+from sqlalchemy import desc, func, text
 from sqlalchemy.orm import Session
 
 from src.infrastructure.db.models import CaseRecord, CaseEmbedding
-from src.infrastructure.db.database import get_db
+from src.infrastructure.db.database import get_db, get_engine
 
 logger = logging.getLogger(__name__)
 
+# pgvector ANN setup for case_embeddings (vectors are JSON until migrated).
+# HNSW: m/ef_construction trade build time + memory for recall; at query time
+# raise hnsw.ef_search (default 40) for recall, lower it for latency.
+HNSW_INDEX_SQL = """\
+ALTER TABLE case_embeddings ADD COLUMN IF NOT EXISTS embedding vector(768);
+UPDATE case_embeddings SET embedding = embedding_vector::text::vector WHERE embedding IS NULL;
+CREATE INDEX IF NOT EXISTS ix_case_embeddings_hnsw ON case_embeddings
+    USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 128);"""
+
 
 class CaseRepository:
     """Repository for analysis cases."""
 
     def save(self, data: dict) -> CaseRecord:
         """Save an analysis result to the database."""
-        with get_db() as db:
+        with get_db() as db, db.no_autoflush:
             record = CaseRecord.from_analysis_dict(data)
             # Check if already exists
             existing = db.query(CaseRecord).filter_by(case_id=record.case_id).first()
@@ -39,6 +49,32 @@ class CaseRepository:
             logger.info(f"Saved case {record.case_id} [{record.final_decision}]")
             return record
 
+    def save_many(self, items: list[dict]) -> int:
+        """
+        Bulk-save analysis results in a single transaction.
+        Cases already in the database (or repeated in `items`) are skipped.
+        Returns the number of inserted cases.
+        """
+        if not items:
+            return 0
+
+        mappings = {}
+        for data in items:
+            mapping = CaseRecord.mapping_from_analysis_dict(data)
+            mappings.setdefault(mapping["case_id"], mapping)
+
+        with get_db() as db:
+            existing = {
+                case_id for (case_id,) in db.query(CaseRecord.case_id).filter(
+                    CaseRecord.case_id.in_(list(mappings))
+                )
+            }
+            new = [m for cid, m in mappings.items() if cid not in existing]
+            if new:
+                db.bulk_insert_mappings(CaseRecord, new)
+            logger.info(f"Bulk-saved {len(new)} cases ({len(existing)} already existed)")
+            return len(new)
+
     def get_by_id(self, case_id: str) -> Optional[dict]:
         """Get a case by its case_id."""
         with get_db() as db:
@@ -96,43 +132,90 @@ class CaseRepository:
                 db.add(emb)
             logger.info(f"Saved embedding for case {case_id} (dim={len(vector)})")
 
-    def search_similar(self, query_vector: list[float], top_k: int = 5) -> list[dict]:
+    def save_embeddings_bulk(self, pairs: list[tuple[str, list[float]]], model: str = "") -> int:
+        """
+        Save many (case_id, vector) embeddings in a single transaction.
+        Existing embeddings are updated in place. Returns the number saved.
+        """
+        if not pairs:
+            return 0
+
+        with get_db() as db:
+            existing = dict(db.query(CaseEmbedding.case_id, CaseEmbedding.id).filter(
+                CaseEmbedding.case_id.in_([cid for cid, _ in pairs])
+            ))
+            inserts, updates = [], []
+            for case_id, vector in pairs:
+                mapping = dict(
+                    case_id=case_id,
+                    embedding_vector=vector,
+                    embedding_model=model,
+                    embedding_dim=len(vector),
+                )
+                if case_id in existing:
+                    updates.append({"id": existing[case_id], **mapping})
+                else:
+                    inserts.append(mapping)
+            if inserts:
+                db.bulk_insert_mappings(CaseEmbedding, inserts)
+            if updates:
+                db.bulk_update_mappings(CaseEmbedding, updates)
+            logger.info(f"Bulk-saved {len(pairs)} embeddings ({len(updates)} updated)")
+            return len(pairs)
+
+    def search_similar(self, query_vector: list[float], top_k: int = 5) -> list[Mapping]:
         """
         Find most similar cases by cosine similarity.
         Works with JSON-stored vectors (SQLite) and pgvector (PostgreSQL).
+        Each hit is a read-only view of the case JSON plus `similarity_score`.
         """
         with get_db() as db:
-            embeddings = db.query(CaseEmbedding).filter(
+            embeddings = db.query(CaseEmbedding.case_id, CaseEmbedding.embedding_vector).filter(
                 CaseEmbedding.embedding_vector.isnot(None)
             ).all()
 
-            if not embeddings:
+            # Keep only vectors matching the query dimension
+            dim = len(query_vector)
+            rows = [(cid, vec) for cid, vec in embeddings if vec and len(vec) == dim]
+            if not rows or top_k <= 0:
                 return []
 
-            # Compute cosine similarity in Python (works with any DB)
-            scored = []
-            for emb in embeddings:
-                vec = emb.embedding_vector
-                if not vec or len(vec) != len(query_vector):
-                    continue
-                sim = self._cosine_similarity(query_vector, vec)
-                scored.append((emb.case_id, sim))
+            # Compute cosine similarity with NumPy (works with any DB)
+            case_ids = [cid for cid, _ in rows]
+            matrix = np.asarray([vec for _, vec in rows], dtype=np.float32)
+            query = np.asarray(query_vector, dtype=np.float32)
+            sims = self._cosine_similarity(matrix, query)
 
-            # Sort by similarity (highest first)
-            scored.sort(key=lambda x: x[1], reverse=True)
-            top = scored[:top_k]
+            # Top-k by similarity (highest first)
+            k = min(top_k, len(case_ids))
+            idx = np.argpartition(-sims, k - 1)[:k]
+            idx = idx[np.argsort(-sims[idx])]
+            top = [(case_ids[i], float(sims[i])) for i in idx]
 
             # Fetch full case data
             results = []
             for case_id, score in top:
                 case = db.query(CaseRecord).filter_by(case_id=case_id).first()
                 if case:
-                    result = case.raw_json.copy() if case.raw_json else {}
-                    result["similarity_score"] = round(score, 4)
-                    results.append(result)
+                    # O(1) overlay — raw_json is shared, never copied or mutated
+                    results.append(ChainMap({"similarity_score": round(score, 4)}, case.raw_json or {}))
 
             return results
 
+    def has_hnsw_index(self) -> Optional[bool]:
+        """
+        Whether case_embeddings has a pgvector HNSW index.
+        None when the backend has no ANN support (SQLite).
+        """
+        if get_engine().dialect.name != "postgresql":
+            return None
+        with get_db() as db:
+            row = db.execute(text(
+                "SELECT 1 FROM pg_indexes "
+                "WHERE tablename = 'case_embeddings' AND indexdef ILIKE '%USING hnsw%' LIMIT 1"
+            )).first()
+            return row is not None
+
     def get_case_text_for_embedding(self, case_id: str) -> str:
         """Get the text representation of a case for embedding."""
         with get_db() as db:
@@ -142,11 +225,8 @@ class CaseRepository:
             return ""
 
     @staticmethod
-    def _cosine_similarity(a: list[float], b: list[float]) -> float:
-        """Compute cosine similarity between two vectors."""
-        dot = sum(x * y for x, y in zip(a, b))
-        norm_a = math.sqrt(sum(x * x for x in a))
-        norm_b = math.sqrt(sum(x * x for x in b))
-        if norm_a == 0 or norm_b == 0:
-            return 0.0
-        return dot / (norm_a * norm_b)
+    def _cosine_similarity(matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Cosine similarity between each row of `matrix` and `query` (0.0 for zero vectors)."""
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        dots = matrix @ query
+        return np.divide(dots, norms, out=np.zeros_like(dots), where=norms != 0)
@@ -6,10 +6,43 @@ Compatible with GCP Vertex AI in production.
 """
 
 import logging
-from typing import Optional
+import time
+from typing import Callable, Optional, TypeVar
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Rate-limit retries (HTTP 429)
+MAX_RETRIES = 4
+BACKOFF_BASE_S = 1.0
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Seconds to wait if `error` is a 429, honoring Retry-After; None otherwise."""
+    status = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if status != 429:
+        return None
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _call_with_retry(fn: Callable[[], T]) -> T:
+    """Call `fn`, retrying rate-limited (429) calls with Retry-After / exponential backoff."""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return fn()
+        except Exception as e:
+            wait = _retry_after_seconds(e)
+            if wait is None or attempt == MAX_RETRIES:
+                raise
+            wait = wait or BACKOFF_BASE_S * 2 ** attempt
+            logger.warning(f"Embedding rate-limited, retrying in {wait:.1f}s")
+            time.sleep(wait)
+
 
 class GeminiEmbeddingService:
     """Generate embeddings using Google Gemini API."""
@@ -17,6 +50,7 @@ class GeminiEmbeddingService:
     # Gemini embedding model
     MODEL = "models/gemini-embedding-001"
     DIMENSION = 768  # default output dimension
+    MAX_BATCH = 100  # texts per batchEmbedContents request
 
     def __init__(self, api_key: str):
         self.api_key = api_key
@@ -45,10 +79,47 @@ class GeminiEmbeddingService:
             logger.error(f"Embedding failed: {e}")
             return None
 
+    async def embed_text_async(self, text: str) -> Optional[list[float]]:
+        """Async variant of `embed_text` using the client's aio API."""
+        try:
+            client = self._get_client()
+            result = await client.aio.models.embed_content(
+                model=self.MODEL,
+                contents=text,
+            )
+            if result and result.embeddings:
+                return list(result.embeddings[0].values)
+            return None
+        except Exception as e:
+            logger.error(f"Embedding failed: {e}")
+            return None
+
+    def embed_texts(self, texts: list[str]) -> list[Optional[list[float]]]:
+        """
+        Generate embeddings for up to MAX_BATCH texts in one request.
+        Returns one vector per text, in order (all None if the request fails).
+        """
+        if not texts:
+            return []
+        try:
+            client = self._get_client()
+            # A list of contents is sent as a single batchEmbedContents call
+            result = _call_with_retry(lambda: client.models.embed_content(
+                model=self.MODEL,
+                contents=list(texts),
+            ))
+            embeddings = (result.embeddings or []) if result else []
+            if len(embeddings) != len(texts):
+                logger.error(f"Batch embedding returned {len(embeddings)} vectors for {len(texts)} texts")
+                return [None] * len(texts)
+            return [list(e.values) if e.values else None for e in embeddings]
+        except Exception as e:
+            logger.error(f"Batch embedding failed ({len(texts)} texts): {e}")
+            return [None] * len(texts)
+
     def embed_batch(self, texts: list[str]) -> list[Optional[list[float]]]:
-        """Generate embeddings for multiple texts."""
+        """Generate embeddings for multiple texts (MAX_BATCH per request)."""
         results = []
-        for text in texts:
-            vec = self.embed_text(text)
-            results.append(vec)
+        for i in range(0, len(texts), self.MAX_BATCH):
+            results.extend(self.embed_texts(texts[i:i + self.MAX_BATCH]))
         return results
@@ -2,17 +2,27 @@
 LLM Fraud Analyzer — Gemini-powered semantic analysis.
 
 Receives OCR fields + rules violations and produces a human-readable
-fraud assessment with structured JSON output.
+fraud assessment in a compact pipe-delimited format (few output tokens).
 
 Uses the new `google-genai` SDK (not deprecated `google-generativeai`).
 """
+import asyncio
+import hashlib
 import json
+import re
 import time
-from dataclasses import dataclass, field, asdict
-from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from google import genai
 
+try:
+    import orjson
+except ImportError:  # optional speed-up; stdlib json fallback
+    orjson = None
+
+from src.infrastructure.cache.ttl_cache import TTLCache
+
 
 @dataclass
 class LLMAnalysis:
@@ -22,52 +32,173 @@ class LLMAnalysis:
     assessment: str = ""                    # Human-readable summary
     anomalies: List[str] = field(default_factory=list)
     recommendation: str = "APPROVE"         # APPROVE, REVIEW, REJECT
-    reasoning: str = ""                     # Step-by-step reasoning
+    reasoning: str = ""                     # Not requested from the model (output-token cost)
     latency_ms: float = 0.0
     model: str = ""
     error: Optional[str] = None
+    cache_hit: bool = False
 
     def to_dict(self) -> dict:
-        return asdict(self)
-
+        # Flat literal instead of dataclasses.asdict (no recursive deep copy)
+        return {
+            "fraud_probability": self.fraud_probability,
+            "risk_level": self.risk_level,
+            "assessment": self.assessment,
+            "anomalies": list(self.anomalies),
+            "recommendation": self.recommendation,
+            "reasoning": self.reasoning,
+            "latency_ms": self.latency_ms,
+            "model": self.model,
+            "error": self.error,
+            "cache_hit": self.cache_hit,
+        }
 
-SYSTEM_PROMPT = """You are a document fraud detection expert. You analyze passport OCR data and rule engine results to detect potential fraud.
+    def to_json(self) -> bytes:
+        """Serialize straight to JSON bytes (orjson handles dataclasses natively)."""
+        if orjson is not None:
+            return orjson.dumps(self)
+        return json.dumps(self.to_dict(), ensure_ascii=False).encode()
 
-IMPORTANT: Respond ONLY with a JSON object, no markdown, no backticks, no extra text.
 
-Input: OCR-extracted fields from a passport and results from a deterministic rules engine.
+SYSTEM_PROMPT = """You are a passport fraud detection expert. Given OCR fields and deterministic rules-engine results, assess fraud risk, including semantic anomalies rules can't catch (name formatting, date consistency, country codes, document patterns).
 
-Your job:
-1. Analyze the OCR fields for semantic inconsistencies
-2. Cross-reference the rules engine violations
-3. Look for patterns that rules can't catch (semantic anomalies)
-4. Provide a fraud probability score
+Reply with ONE line, no markdown, no extra text:
+prob|risk|rec|assessment|anomaly;anomaly
+- prob: fraud probability 0.0-1.0
+- risk: LOW|MEDIUM|HIGH|CRITICAL
+- rec: APPROVE|REVIEW|REJECT
+- assessment: brief summary without "|"
+- anomalies: ";"-separated, empty if none
 
-Output JSON format:
-{
-    "fraud_probability": 0.0 to 1.0,
-    "risk_level": "LOW" | "MEDIUM" | "HIGH" | "CRITICAL",
-    "assessment": "Brief human-readable summary",
-    "anomalies": ["list of specific anomalies found"],
-    "recommendation": "APPROVE" | "REVIEW" | "REJECT",
-    "reasoning": "Step-by-step analysis reasoning"
-}
+Input keys: pi=surname, si=given names, dn=doc number, nat=nationality, dob/doe=birth/expiry date, iss=issuing country, sx=sex; RULES s=risk score, l=risk level, v=violations as sev:rule:detail.
 
 Rules:
-- If rules engine found NO violations and fields look consistent → fraud_probability < 0.2, APPROVE
-- If rules engine found checksum violations → fraud_probability > 0.7, likely REJECT
-- If semantic inconsistencies → fraud_probability 0.3-0.7, REVIEW
-- Always explain your reasoning
-- Consider: name formatting, date consistency, country codes, document patterns
+- no violations, consistent fields -> prob<0.2, APPROVE
+- checksum violations -> prob>0.7, likely REJECT
+- semantic inconsistencies -> prob 0.3-0.7, REVIEW
 """
 
 
+# OCR fields sent to the LLM → short prompt keys (everything else is dropped)
+LLM_RELEVANT_FIELDS = {
+    "primary_identifier": "pi",
+    "secondary_identifier": "si",
+    "document_number": "dn",
+    "nationality": "nat",
+    "date_of_birth": "dob",
+    "date_of_expiry": "doe",
+    "issuing_country": "iss",
+    "sex": "sx",
+}
+
+
+# Markdown code fences the model sometimes wraps its reply in
+_FENCE_RE = re.compile(r"^```[a-z]*\s*|\s*```$", re.M)
+
+
+def parse_compact_response(raw: str) -> dict:
+    """
+    Parse the pipe-delimited reply `prob|risk|rec|assessment|anomaly;anomaly`.
+
+    Markdown fences and lines without a pipe are ignored.
+    Raises ValueError if no well-formed line is found.
+    """
+    raw = _FENCE_RE.sub("", raw)
+    line = next((l for l in raw.splitlines() if "|" in l), "")
+    parts = [p.strip() for p in line.strip().split("|", 4)]
+    if len(parts) < 4:
+        raise ValueError(f"expected 'prob|risk|rec|assessment|anomalies', got {raw[:200]!r}")
+
+    anomalies = parts[4].split(";") if len(parts) > 4 else []
+    return {
+        "fraud_probability": float(parts[0]),
+        "risk_level": parts[1].upper() or "LOW",
+        "recommendation": parts[2].upper() or "APPROVE",
+        "assessment": parts[3],
+        "anomalies": [a.strip() for a in anomalies if a.strip()],
+    }
+
+
+def parse_partial_response(buffer: str) -> dict:
+    """
+    Parse the fields already terminated by "|" in a still-streaming reply.
+
+    Only complete fields are returned, so values never change between
+    snapshots. Unparseable values are left out rather than raising.
+    """
+    first_pipe = buffer.find("|")
+    if first_pipe < 0:
+        return {}
+    line = buffer[buffer.rfind("\n", 0, first_pipe) + 1:].split("\n", 1)[0]
+    parts = [p.strip() for p in line.strip("`").split("|")][:-1]
+
+    data = {}
+    if len(parts) > 0:
+        try:
+            data["fraud_probability"] = float(parts[0])
+        except ValueError:
+            pass
+    if len(parts) > 1 and parts[1]:
+        data["risk_level"] = parts[1].upper()
+    if len(parts) > 2 and parts[2]:
+        data["recommendation"] = parts[2].upper()
+    if len(parts) > 3:
+        data["assessment"] = parts[3]
+    return data
+
+
+# ── Rules-only fast path ─────────────────────────────────────────────
+# Unambiguous rules verdicts skip the LLM round-trip entirely.
+FASTPATH_MODEL = "rules-fastpath"
+FASTPATH_MAX_CLEAN_RISK = 0.1
+# Mid-risk cases below this score (with ≤1 violation) go to the fast model
+FAST_MODEL_MAX_RISK = 0.5
+
+
+def rules_fastpath(rules_violations: List[Dict], risk_score: float) -> Optional[dict]:
+    """
+    Synthesize an analysis for clear-cut cases, or None if the LLM is needed.
+
+    - No violations and risk < 0.1 → APPROVE
+    - Any CRITICAL violation (checksums, cross-check, dates) → REJECT
+    """
+    violations = rules_violations or []
+    if not violations and risk_score < FASTPATH_MAX_CLEAN_RISK:
+        return {
+            "fraud_probability": 0.05,
+            "risk_level": "LOW",
+            "recommendation": "APPROVE",
+            "assessment": "No rule violations; rules-only fast path",
+        }
+
+    critical = [v for v in violations if v.get("severity") == "CRITICAL"]
+    if critical:
+        return {
+            "fraud_probability": 0.95,
+            "risk_level": "CRITICAL",
+            "recommendation": "REJECT",
+            "assessment": f"{len(critical)} critical rule violation(s); rules-only fast path",
+            "anomalies": [f"{v.get('rule_name', '?')}: {v.get('detail', '?')}" for v in critical],
+        }
+    return None
+
+
 class LLMFraudAnalyzer:
     """Gemini-powered fraud analysis for passport documents."""
 
-    def __init__(self, api_key: str, model_name: str = "gemini-2.0-flash"):
-        self.model_name = model_name
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str = "gemini-2.0-flash",
+        fast_model: Optional[str] = "gemini-2.0-flash-lite",
+        cache_ttl_seconds: float = 24 * 3600,
+        cache_size: int = 1024,
+    ):
+        self.model_name = model_name        # strong model for hard cases
+        self.fast_model = fast_model or model_name
         self.client = genai.Client(api_key=api_key)
+        # Parsed replies keyed on the normalized input (ttl <= 0 disables)
+        self._cache = TTLCache(maxsize=cache_size, ttl_seconds=cache_ttl_seconds)
 
     def analyze(
         self,
@@ -75,6 +206,8 @@ class LLMFraudAnalyzer:
         rules_violations: List[Dict] = None,
         risk_score: float = 0.0,
         risk_level: str = "LOW",
+        stream: bool = False,
+        force_llm: bool = False,
     ) -> LLMAnalysis:
         """
         Analyze passport data for fraud using Gemini.
@@ -84,90 +217,239 @@ class LLMFraudAnalyzer:
             rules_violations: List of rule violation dicts
             risk_score: Current risk score from rules engine
             risk_level: Current risk level from rules engine
+            stream: Consume `analyze_stream()` and return its final snapshot
+            force_llm: Call Gemini even when the rules verdict is unambiguous
 
         Returns:
             LLMAnalysis with fraud assessment
         """
+        if stream:
+            final = None
+            for final in self.analyze_stream(
+                ocr_fields, rules_violations, risk_score, risk_level, force_llm=force_llm
+            ):
+                pass
+            return final
+
         t0 = time.perf_counter()
+        model = self._select_model(rules_violations, risk_score)
+
+        key, early = self._shortcut(t0, model, ocr_fields, rules_violations, risk_score, risk_level, force_llm)
+        if early is not None:
+            return early
 
         # Build the prompt
         user_prompt = self._build_prompt(ocr_fields, rules_violations, risk_score, risk_level)
 
         try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=[SYSTEM_PROMPT + "\n\n" + user_prompt],
-                config={
-                    "temperature": 0.1,
-                    "max_output_tokens": 1024,
-                },
-            )
-
-            # Parse JSON response
-            raw = response.text.strip()
-            # Handle markdown code blocks
-            if raw.startswith("```"):
-                lines = raw.split("\n")
-                raw = "\n".join(lines[1:])  # remove first line
-                if raw.rstrip().endswith("```"):
-                    raw = raw.rstrip()[:-3]
-                raw = raw.strip()
-
-            data = json.loads(raw)
-            latency = (time.perf_counter() - t0) * 1000
-
-            return LLMAnalysis(
-                fraud_probability=float(data.get("fraud_probability", 0)),
-                risk_level=data.get("risk_level", "LOW"),
-                assessment=data.get("assessment", ""),
-                anomalies=data.get("anomalies", []),
-                recommendation=data.get("recommendation", "APPROVE"),
-                reasoning=data.get("reasoning", ""),
-                latency_ms=round(latency, 1),
-                model=self.model_name,
-            )
-
-        except json.JSONDecodeError as e:
-            latency = (time.perf_counter() - t0) * 1000
-            return LLMAnalysis(
-                error=f"JSON parse error: {e}. Raw: {raw[:200]}",
-                latency_ms=round(latency, 1),
-                model=self.model_name,
-            )
+            response = self.client.models.generate_content(**self._request(user_prompt, model))
+
+            # Parse compact pipe-delimited response
+            data = parse_compact_response(response.text.strip())
+            self._cache.set(key, data)
+            return self._result(t0, **data, model=model)
+
+        except ValueError as e:
+            return self._result(t0, error=f"Response parse error: {e}", model=model)
         except Exception as e:
-            latency = (time.perf_counter() - t0) * 1000
-            return LLMAnalysis(
-                error=f"LLM error: {e}",
-                latency_ms=round(latency, 1),
-                model=self.model_name,
-            )
+            return self._result(t0, error=f"LLM error: {e}", model=model)
 
-    def _build_prompt(
+    def analyze_stream(
+        self,
+        ocr_fields: Dict[str, str],
+        rules_violations: List[Dict] = None,
+        risk_score: float = 0.0,
+        risk_level: str = "LOW",
+        force_llm: bool = False,
+    ) -> Iterator[LLMAnalysis]:
+        """
+        Streaming variant of `analyze()`.
+
+        Yields a partial LLMAnalysis each time a new field of the
+        pipe-delimited reply is complete (fraud_probability arrives
+        first, so callers can gate on it at ~TTFT), then the final one.
+        """
+        t0 = time.perf_counter()
+        model = self._select_model(rules_violations, risk_score)
+
+        key, early = self._shortcut(t0, model, ocr_fields, rules_violations, risk_score, risk_level, force_llm)
+        if early is not None:
+            yield early
+            return
+
+        user_prompt = self._build_prompt(ocr_fields, rules_violations, risk_score, risk_level)
+
+        buffer = ""
+        fields_done = 0
+        try:
+            for chunk in self.client.models.generate_content_stream(**self._request(user_prompt, model)):
+                buffer += chunk.text or ""
+                complete = min(buffer.count("|"), 4)
+                if complete > fields_done:
+                    fields_done = complete
+                    yield self._result(t0, **parse_partial_response(buffer), model=model)
+
+            data = parse_compact_response(buffer.strip())
+            self._cache.set(key, data)
+            yield self._result(t0, **data, model=model)
+
+        except ValueError as e:
+            yield self._result(t0, error=f"Response parse error: {e}", model=model)
+        except Exception as e:
+            yield self._result(t0, error=f"LLM error: {e}", model=model)
+
+    async def analyze_async(
         self,
         ocr_fields: Dict[str, str],
+        rules_violations: List[Dict] = None,
+        risk_score: float = 0.0,
+        risk_level: str = "LOW",
+        force_llm: bool = False,
+    ) -> LLMAnalysis:
+        """Async variant of `analyze()` using the client's aio API."""
+        t0 = time.perf_counter()
+        model = self._select_model(rules_violations, risk_score)
+
+        key, early = self._shortcut(t0, model, ocr_fields, rules_violations, risk_score, risk_level, force_llm)
+        if early is not None:
+            return early
+
+        user_prompt = self._build_prompt(ocr_fields, rules_violations, risk_score, risk_level)
+
+        try:
+            response = await self.client.aio.models.generate_content(**self._request(user_prompt, model))
+            data = parse_compact_response(response.text.strip())
+            self._cache.set(key, data)
+            return self._result(t0, **data, model=model)
+
+        except ValueError as e:
+            return self._result(t0, error=f"Response parse error: {e}", model=model)
+        except Exception as e:
+            return self._result(t0, error=f"LLM error: {e}", model=model)
+
+    async def analyze_many(
+        self,
+        items: List[Tuple[Dict[str, str], List[Dict], float, str]],
+        concurrency: int = 8,
+        force_llm: bool = False,
+    ) -> List[LLMAnalysis]:
+        """
+        Analyze many documents concurrently over the shared client.
+
+        Args:
+            items: (ocr_fields, rules_violations, risk_score, risk_level) per document
+            concurrency: Max in-flight Gemini requests
+            force_llm: Disable the rules-only fast path for every item
+
+        Returns:
+            One LLMAnalysis per item, in input order
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(item):
+            async with semaphore:
+                return await self.analyze_async(*item, force_llm=force_llm)
+
+        return list(await asyncio.gather(*(run(item) for item in items)))
+
+    def analyze_many_sync(
+        self,
+        items: List[Tuple[Dict[str, str], List[Dict], float, str]],
+        concurrency: int = 8,
+        force_llm: bool = False,
+    ) -> List[LLMAnalysis]:
+        """Blocking wrapper around `analyze_many()` (not for use inside a running loop)."""
+        return asyncio.run(self.analyze_many(items, concurrency=concurrency, force_llm=force_llm))
+
+    def _select_model(self, rules_violations: List[Dict], risk_score: float) -> str:
+        """Fast model for mild, single-violation cases; strong model otherwise."""
+        violations = rules_violations or []
+        if len(violations) <= 1 and FASTPATH_MAX_CLEAN_RISK <= risk_score < FAST_MODEL_MAX_RISK:
+            return self.fast_model
+        return self.model_name
+
+    def _request(self, user_prompt: str, model: str) -> dict:
+        """Keyword arguments shared by generate_content / generate_content_stream."""
+        return {
+            "model": model,
+            "contents": [SYSTEM_PROMPT + "\n\n" + user_prompt],
+            "config": {
+                "temperature": 0.1,
+                "max_output_tokens": 256,
+            },
+        }
+
+    def _shortcut(
+        self,
+        t0: float,
+        model: str,
+        ocr_fields: Dict[str, str],
+        rules_violations: List[Dict],
+        risk_score: float,
+        risk_level: str,
+        force_llm: bool,
+    ) -> Tuple[str, Optional[LLMAnalysis]]:
+        """
+        Answer without calling Gemini when possible.
+
+        Returns (cache_key, analysis); analysis is None when the LLM must run.
+        """
+        if not force_llm:
+            verdict = rules_fastpath(rules_violations, risk_score)
+            if verdict is not None:
+                return "", self._result(t0, **verdict, model=FASTPATH_MODEL)
+
+        key = self._cache_key(model, ocr_fields, rules_violations, risk_score, risk_level)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return key, self._result(t0, **cached, cache_hit=True, model=model)
+        return key, None
+
+    def _result(self, t0: float, **fields) -> LLMAnalysis:
+        """Build an LLMAnalysis stamped with model name and elapsed time."""
+        if "anomalies" in fields:
+            fields["anomalies"] = list(fields["anomalies"])  # never share cached lists
+        latency = (time.perf_counter() - t0) * 1000
+        return LLMAnalysis(**fields, latency_ms=round(latency, 1))
+
+    def _cache_key(
+        self,
+        model: str,
+        ocr_fields: Dict[str, str],
         rules_violations: List[Dict],
         risk_score: float,
         risk_level: str,
     ) -> str:
-        """Build the user prompt with document data."""
-        parts = ["Analyze this passport for potential fraud:\n"]
-
-        # OCR fields
-        parts.append("## OCR Extracted Fields")
-        for name, value in sorted(ocr_fields.items()):
-            if value and value not in ("[BBOX_PRESENT]", ""):
-                parts.append(f"  {name}: {value}")
-
-        # Rules result
-        parts.append(f"\n## Rules Engine Result")
-        parts.append(f"  Risk Score: {risk_score}")
-        parts.append(f"  Risk Level: {risk_level}")
-
-        if rules_violations:
-            parts.append(f"  Violations ({len(rules_violations)}):")
-            for v in rules_violations:
-                parts.append(f"    - [{v.get('severity', '?')}] {v.get('rule_name', '?')}: {v.get('detail', '?')}")
+        """Content hash of everything that influences the prompt + model."""
+        # Only LLM_RELEVANT_FIELDS reach the prompt, so only they are hashed
+        payload = {
+            "f": [ocr_fields.get(name) for name in LLM_RELEVANT_FIELDS],
+            "v": rules_violations or [],
+            "s": risk_score,
+            "l": risk_level,
+            "m": model,
+        }
+        if orjson is not None:
+            encoded = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS, default=str)
         else:
-            parts.append("  Violations: None (all rules passed)")
+            encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+        return hashlib.blake2b(encoded, digest_size=16).hexdigest()
 
-        return "\n".join(parts)
+    def _build_prompt(
+        self,
+        ocr_fields: Dict[str, str],
+        rules_violations: List[Dict],
+        risk_score: float,
+        risk_level: str,
+    ) -> str:
+        """Build the compact user prompt (short keys, LLM-relevant fields only)."""
+        ocr = ";".join(
+            f"{short}={ocr_fields[name]}"
+            for name, short in LLM_RELEVANT_FIELDS.items()
+            if ocr_fields.get(name) and ocr_fields[name] != "[BBOX_PRESENT]"
+        )
+        violations = ";".join(
+            f"{v.get('severity', '?')}:{v.get('rule_name', '?')}:{v.get('detail', '?')}"
+            for v in rules_violations or []
+        )
+        return f"OCR: {ocr}\nRULES: s={risk_score};l={risk_level};v={violations or 'none'}"
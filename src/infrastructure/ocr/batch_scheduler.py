@@ -0,0 +1,106 @@
+"""
+Dynamic batcher for OCR recognition across concurrent requests.
+
+Concurrent requests each submit their field crops; a single background task
+collects them and flushes one recognizer call when the batch is full or the
+oldest crop has waited `max_wait_ms`. Throughput grows with the batch size
+(up to the recognizer's rec_batch_num) for at most `max_wait_ms` extra latency.
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+
+# Sync recognizer: crops → [(text, confidence)] in the same order
+RecognizeFn = Callable[[List[np.ndarray]], List[Tuple[str, float]]]
+
+
+@dataclass
+class BatchConfig:
+    """Flush policy for DynamicBatcher."""
+    max_batch_size: int = 32        # hard cap per recognizer call
+    max_wait_ms: float = 50.0       # latency budget for the oldest queued crop
+    preferred_batch_size: int = 16  # flush early once reached and the queue is idle
+
+
+class DynamicBatcher:
+    """
+    asyncio batcher in front of a synchronous recognizer.
+
+    The recognizer runs in a worker thread (asyncio.to_thread), so the event
+    loop keeps accepting crops for the next batch while one is being recognized.
+    """
+
+    def __init__(self, recognize: RecognizeFn, config: Optional[BatchConfig] = None):
+        self._recognize = recognize
+        self.config = config or BatchConfig()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def submit(self, crop: np.ndarray) -> Tuple[str, float]:
+        """Queue one crop and wait for its (text, confidence)."""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((crop, future))
+        return await future
+
+    async def submit_many(self, crops: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """Queue all crops of one document; results keep the input order."""
+        if not crops:
+            return []
+        return list(await asyncio.gather(*(self.submit(c) for c in crops)))
+
+    async def close(self):
+        """Stop the background flush task."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    # ── Internals ──
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def _run(self):
+        cfg = self.config
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + cfg.max_wait_ms / 1000.0
+
+            while len(batch) < cfg.max_batch_size:
+                if len(batch) >= cfg.preferred_batch_size and self._queue.empty():
+                    break
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: list):
+        crops = [crop for crop, _ in batch]
+        try:
+            results = await asyncio.to_thread(self._recognize, crops)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -7,6 +7,9 @@ EasyOCR handles the variable-font VIZ (Visual Inspection Zone) text.
 
 import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
 import numpy as np
 import logging
@@ -17,17 +20,51 @@ from src.core.interfaces.ocr_engine import IOCREngine, OCRResult, OCRField
 
 logger = logging.getLogger(__name__)
 
-MRZ_CHARS = set("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789<")
+MRZ_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789<"
+MRZ_CHARS = set(MRZ_ALPHABET)
+MRZ_MIN_LINE_LEN = 30  # shorter cleaned lines are detection noise, not MRZ
+
+# This engine uses the PaddleOCR 3.x API throughout: constructor option names,
+# predict() and the rec_texts/rec_scores/rec_polys result objects.
+PADDLEOCR_MIN_MAJOR = 3
+
+
+class _DeleteUnlisted(dict):
+    """str.translate table: listed code points map as given, all others are deleted."""
+
+    def __missing__(self, key):
+        return None
+
+
+# MRZ characters map to themselves; everything else (incl. non-ASCII) is deleted
+_MRZ_TRANS = _DeleteUnlisted(str.maketrans(MRZ_ALPHABET, MRZ_ALPHABET))
 
 
 def _clean_mrz_line(text: str) -> str:
     """Clean OCR output to valid MRZ characters."""
-    text = text.upper().replace(" ", "").replace("\n", "")
-    cleaned = []
-    for ch in text:
-        if ch in MRZ_CHARS:
-            cleaned.append(ch)
-    return "".join(cleaned)
+    return text.upper().translate(_MRZ_TRANS)
+
+
+def _too_short_for_mrz(text: str) -> bool:
+    """
+    Cheap pre-filter before cleaning: cleaning only deletes characters,
+    so a short ASCII line can never reach MRZ length. (Non-ASCII text is
+    not rejected here — Unicode upper() may expand, e.g. ß → SS.)
+    """
+    return len(text) < MRZ_MIN_LINE_LEN and text.isascii()
+
+
+_MODEL_NAME_RE = re.compile(r"^\s*model_name:\s*['\"]?([\w.\-]+)", re.MULTILINE)
+
+
+def _paddlex_model_name(model_dir: str) -> str | None:
+    """Model name from a PaddleX/PaddleOCR 3.x export's inference.yml (None if absent)."""
+    try:
+        with open(os.path.join(model_dir, "inference.yml"), encoding="utf-8") as f:
+            match = _MODEL_NAME_RE.search(f.read())
+    except OSError:
+        return None
+    return match.group(1) if match else None
 
 
 class HybridOCREngine(IOCREngine):
@@ -35,36 +72,123 @@ class HybridOCREngine(IOCREngine):
     Hybrid OCR: PaddleOCR v5 for MRZ + EasyOCR for VIZ text.
     """
 
-    def __init__(self, lang: str = "en", use_gpu: bool = False):
+    # MRZ lives in the bottom 45% of a TD3 data page; one crop serves both engines
+    MRZ_CROP_TOP = 0.55
+
+    def __init__(
+        self,
+        lang: str = "en",
+        use_gpu: bool = False,
+        warmup: bool = False,
+        fp16: bool = True,
+        use_tensorrt: bool = False,
+        int8_rec: bool = False,
+    ):
         self.lang = lang
         self.use_gpu = use_gpu
+        self.fp16 = fp16                    # GPU only
+        self.use_tensorrt = use_tensorrt    # GPU only, needs a TensorRT-enabled paddle build
+        self.int8_rec = int8_rec            # use a pre-quantized (slim) Paddle recognizer if shipped
         self._paddle = None
         self._easyocr = None
+        # Paddle MRZ and EasyOCR VIZ run concurrently (native inference releases the GIL);
+        # the EasyOCR reader itself is shared by VIZ + MRZ fallback, so calls are serialized
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hybrid-ocr")
+        self._easyocr_lock = threading.Lock()
+        if warmup:
+            self.warmup()
+
+    def warmup(self):
+        """Load both engines and run a dummy image through each (avoids first-request cold start)."""
+        dummy = np.zeros((32, 32, 3), dtype=np.uint8)
+        try:
+            self._get_paddle().predict(dummy)
+        except Exception as e:
+            logger.warning(f"PaddleOCR warmup failed: {e}")
+        try:
+            self._get_easyocr().readtext(dummy)
+        except Exception as e:
+            logger.warning(f"EasyOCR warmup failed: {e}")
+
+    # Pre-quantized int8 recognizer (PaddleSlim export), looked up under models/paddle
+    PADDLE_INT8_REC_DIR = "en_PP-OCRv3_rec_slim_infer"
+
+    # Local model folders under models/paddle, by PaddleOCR 3.x model role
+    PADDLE_LOCAL_MODELS = {
+        "text_detection": "en_PP-OCRv3_det_infer",
+        "text_recognition": "en_PP-OCRv3_rec_infer",
+        "textline_orientation": "ch_ppocr_mobile_v2.0_cls_infer",
+    }
 
     def _get_paddle(self):
         if self._paddle is None:
+            import paddleocr
             from paddleocr import PaddleOCR
-            
-            # Check for local models
-            # Path: src/infrastructure/ocr/models/paddle
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            model_dir = os.path.join(base_dir, "models", "paddle")
-            
-            kwargs = {"lang": "en", "use_angle_cls": True, "show_log": False}
-            
-            # Verify if specific model folders exist
-            det_dir = os.path.join(model_dir, "en_PP-OCRv3_det_infer")
-            rec_dir = os.path.join(model_dir, "en_PP-OCRv3_rec_infer")
-            
-            if os.path.exists(model_dir) and os.path.exists(det_dir) and os.path.exists(rec_dir):
-                logger.info(f"Using local PaddleOCR models from {model_dir}")
-                kwargs["det_model_dir"] = det_dir
-                kwargs["rec_model_dir"] = rec_dir
-                kwargs["cls_model_dir"] = os.path.join(model_dir, "ch_ppocr_mobile_v2.0_cls_infer")
-            
+
+            major = int(str(getattr(paddleocr, "__version__", "0")).split(".")[0] or 0)
+            if major < PADDLEOCR_MIN_MAJOR:
+                raise RuntimeError(
+                    f"HybridOCREngine needs paddleocr>={PADDLEOCR_MIN_MAJOR} "
+                    f"(predict() API); found {paddleocr.__version__}"
+                )
+
+            kwargs = {"lang": "en", "use_textline_orientation": True}
+            kwargs.update(self._paddle_device_kwargs())
+            kwargs.update(self._paddle_local_model_kwargs())
             self._paddle = PaddleOCR(**kwargs)
         return self._paddle
 
+    def _paddle_local_model_kwargs(self) -> dict:
+        """
+        PaddleOCR 3.x *_model_dir / *_model_name options for local models
+        (src/infrastructure/ocr/models/paddle). Only PaddleX-format exports
+        (with inference.yml naming the model) are used; others are skipped
+        and the default models are downloaded instead.
+        """
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        model_dir = os.path.join(base_dir, "models", "paddle")
+        folders = dict(self.PADDLE_LOCAL_MODELS)
+
+        if self.int8_rec:
+            if os.path.exists(os.path.join(model_dir, self.PADDLE_INT8_REC_DIR)):
+                folders["text_recognition"] = self.PADDLE_INT8_REC_DIR
+            else:
+                logger.warning(
+                    f"int8 recognizer not found at {os.path.join(model_dir, self.PADDLE_INT8_REC_DIR)}"
+                    " — keeping default precision"
+                )
+
+        kwargs = {}
+        for role, folder in folders.items():
+            path = os.path.join(model_dir, folder)
+            if not os.path.exists(path):
+                continue
+            name = _paddlex_model_name(path)
+            if name is None:
+                logger.warning(f"Skipping local PaddleOCR model {path}: not a PaddleOCR 3.x export")
+                continue
+            logger.info(f"Using local PaddleOCR {role} model {name} from {path}")
+            kwargs[f"{role}_model_dir"] = path
+            kwargs[f"{role}_model_name"] = name
+        return kwargs
+
+    def _paddle_device_kwargs(self) -> dict:
+        """PaddleOCR 3.x inference options: FP16 (+TensorRT) on GPU, MKL-DNN on CPU."""
+        if self.use_gpu:
+            kwargs = {
+                "device": "gpu",
+                "precision": "fp16" if self.fp16 else "fp32",
+                "text_det_limit_side_len": 960,
+            }
+            if self.use_tensorrt:
+                kwargs["use_tensorrt"] = True
+            return kwargs
+        return {
+            "device": "cpu",
+            "enable_mkldnn": True,
+            "cpu_threads": os.cpu_count() or 1,
+        }
+
     def _get_easyocr(self):
         if self._easyocr is None:
             import easyocr
@@ -74,7 +198,8 @@ class HybridOCREngine(IOCREngine):
             base_dir = os.path.dirname(os.path.abspath(__file__))
             model_dir = os.path.join(base_dir, "models", "easyocr")
             
-            kwargs = {"gpu": self.use_gpu, "verbose": False}
+            # quantize: int8 dynamic quantization of the recognizer (applies on CPU)
+            kwargs = {"gpu": self.use_gpu, "quantize": True, "verbose": False}
             
             if os.path.exists(model_dir) and os.listdir(model_dir):
                 logger.info(f"Using local EasyOCR models from {model_dir}")
@@ -96,29 +221,32 @@ class HybridOCREngine(IOCREngine):
                 doc_type_detected="UNKNOWN", ocr_engine="Hybrid"
             )
 
-        # ── 1. Extract MRZ with PaddleOCR v5 ──
-        mrz_upper, mrz_lower, mrz_conf = self._extract_mrz_paddle(image)
+        h = image.shape[0]
+        mrz_crop = image[int(h * self.MRZ_CROP_TOP):, :]
+
+        # ── 1. MRZ with PaddleOCR v5 ‖ VIZ text with EasyOCR ──
+        paddle_future = self._pool.submit(self._extract_mrz_paddle, mrz_crop)
+        viz_future = self._pool.submit(self._extract_viz, image)
+        mrz_upper, mrz_lower, mrz_conf = paddle_future.result()
 
         # ── 2. Fallback to EasyOCR if PaddleOCR failed ──
         if not mrz_upper or not mrz_lower:
             logger.info("PaddleOCR MRZ incomplete, trying EasyOCR fallback...")
-            easy_upper, easy_lower = self._extract_mrz_easyocr(image)
+            easy_upper, easy_lower = self._extract_mrz_easyocr(mrz_crop)
             if not mrz_upper and easy_upper:
                 mrz_upper = easy_upper
             if not mrz_lower and easy_lower:
                 mrz_lower = easy_lower
 
-        # ── 3. Extract VIZ text with EasyOCR ──
-        full_text = self._extract_viz(image)
+        # ── 3. Collect VIZ text ──
+        full_text = viz_future.result()
 
         # ── 4. Build structured fields ──
         fields = []
-        confs = []
 
         if mrz_upper:
             conf = mrz_conf
             fields.append(OCRField("mrz_upper_line", mrz_upper, conf))
-            confs.append(conf)
 
             # Parse names from MRZ line 1
             if len(mrz_upper) >= 40:
@@ -126,46 +254,38 @@ class HybridOCREngine(IOCREngine):
                 if names:
                     primary = names[0].replace("<", " ").strip()
                     fields.append(OCRField("primary_identifier", primary, conf))
-                    confs.append(conf)
                 if len(names) >= 2:
                     secondary = names[1].replace("<", " ").strip()
                     if secondary:
                         fields.append(OCRField("secondary_identifier", secondary, conf))
-                        confs.append(conf)
 
                 # Issuing country from line 1 position 2:5
                 issuing = mrz_upper[2:5]
                 fields.append(OCRField("issuing_country", issuing, conf))
-                confs.append(conf)
 
         if mrz_lower:
             fields.append(OCRField("mrz_lower_line", mrz_lower, mrz_conf))
-            confs.append(mrz_conf)
 
             if len(mrz_lower) >= 28:
                 doc_num = mrz_lower[0:9].replace("<", "")
                 fields.append(OCRField("document_number", doc_num, mrz_conf))
-                confs.append(mrz_conf)
 
                 nationality = mrz_lower[10:13]
                 fields.append(OCRField("nationality", nationality, mrz_conf))
-                confs.append(mrz_conf)
 
                 dob_raw = mrz_lower[13:19]
                 dob = self._format_date(dob_raw)
                 fields.append(OCRField("date_of_birth", dob, mrz_conf))
-                confs.append(mrz_conf)
 
                 sex = mrz_lower[20]
                 fields.append(OCRField("sex", sex, mrz_conf))
-                confs.append(mrz_conf)
 
                 doe_raw = mrz_lower[21:27]
                 doe = self._format_date(doe_raw)
                 fields.append(OCRField("date_of_expiry", doe, mrz_conf))
-                confs.append(mrz_conf)
 
-        avg_conf = sum(confs) / len(confs) if confs else 0.0
+        # Every MRZ-derived field carries the same MRZ confidence
+        avg_conf = mrz_conf if fields else 0.0
 
         return OCRResult(
             raw_text=full_text,
@@ -180,20 +300,18 @@ class HybridOCREngine(IOCREngine):
             },
         )
 
-    def _extract_mrz_paddle(self, image: np.ndarray) -> tuple[str, str, float]:
+    def _extract_mrz_paddle(self, mrz_crop: np.ndarray) -> tuple[str, str, float]:
         """
-        Extract MRZ using PaddleOCR v5 predict() API.
+        Extract MRZ from the MRZ crop using PaddleOCR v5 predict() API.
         Returns (mrz_upper, mrz_lower, avg_confidence).
         """
-        h, w = image.shape[:2]
-        mrz_crop = image[int(h * 0.55):, :]  # bottom 45%
-
         try:
             paddle = self._get_paddle()
             results = paddle.predict(mrz_crop)
 
             # PaddleOCR v5 returns list of result objects
-            mrz_candidates = []
+            # Candidates kept as parallel lists: y position, cleaned line, score
+            cand_y, cand_lines, cand_scores = [], [], []
             for res in results:
                 if hasattr(res, 'rec_texts') and hasattr(res, 'rec_scores'):
                     texts = res.rec_texts
@@ -201,28 +319,32 @@ class HybridOCREngine(IOCREngine):
                     polys = res.rec_polys if hasattr(res, 'rec_polys') else [None] * len(texts)
 
                     for text, score, poly in zip(texts, scores, polys):
+                        if _too_short_for_mrz(text):
+                            continue
                         clean = _clean_mrz_line(text)
                         y_pos = poly[0][1] if poly is not None and len(poly) > 0 else 0
-                        if len(clean) >= 30:
+                        if len(clean) >= MRZ_MIN_LINE_LEN:
                             # Pad to 44 if close
                             if 40 <= len(clean) <= 44:
                                 clean = clean[:44].ljust(44, "<")
-                            mrz_candidates.append((float(y_pos), clean, float(score)))
-
-            # Sort by Y position (top to bottom)
-            mrz_candidates.sort(key=lambda x: x[0])
+                            cand_y.append(y_pos)
+                            cand_lines.append(clean)
+                            cand_scores.append(score)
 
             mrz_upper = ""
             mrz_lower = ""
             avg_conf = 0.95
 
-            if len(mrz_candidates) >= 2:
-                mrz_upper = mrz_candidates[-2][1]  # second to last (line 1)
-                mrz_lower = mrz_candidates[-1][1]  # last (line 2)
-                avg_conf = (mrz_candidates[-2][2] + mrz_candidates[-1][2]) / 2
-            elif len(mrz_candidates) == 1:
-                line = mrz_candidates[0][1]
-                avg_conf = mrz_candidates[0][2]
+            if len(cand_lines) >= 2:
+                # Bottom two lines by Y position (stable, like the sort it replaces)
+                order = np.argsort(np.asarray(cand_y, dtype=np.float64), kind="stable")
+                i_upper, i_lower = order[-2], order[-1]
+                mrz_upper = cand_lines[i_upper]  # second to last (line 1)
+                mrz_lower = cand_lines[i_lower]  # last (line 2)
+                avg_conf = (float(cand_scores[i_upper]) + float(cand_scores[i_lower])) / 2
+            elif len(cand_lines) == 1:
+                line = cand_lines[0]
+                avg_conf = float(cand_scores[0])
                 # Determine if it's line 1 or 2
                 if line.startswith("P"):
                     mrz_upper = line
@@ -235,22 +357,22 @@ class HybridOCREngine(IOCREngine):
             logger.warning(f"PaddleOCR MRZ extraction failed: {e}")
             return "", "", 0.0
 
-    def _extract_mrz_easyocr(self, image: np.ndarray) -> tuple[str, str]:
-        """Fallback MRZ extraction using EasyOCR."""
-        h, w = image.shape[:2]
-        mrz_crop = image[int(h * 0.60):, :]
-
+    def _extract_mrz_easyocr(self, mrz_crop: np.ndarray) -> tuple[str, str]:
+        """Fallback MRZ extraction from the MRZ crop using EasyOCR."""
         try:
-            reader = self._get_easyocr()
-            results = reader.readtext(
-                mrz_crop,
-                allowlist="ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789<",
-                paragraph=False, width_ths=1.5,
-            )
+            with self._easyocr_lock:
+                reader = self._get_easyocr()
+                results = reader.readtext(
+                    mrz_crop,
+                    allowlist="ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789<",
+                    paragraph=False, width_ths=1.5,
+                )
             candidates = []
             for r in sorted(results, key=lambda x: x[0][0][1]):
+                if _too_short_for_mrz(r[1]):
+                    continue
                 text = _clean_mrz_line(r[1])
-                if len(text) >= 30:
+                if len(text) >= MRZ_MIN_LINE_LEN:
                     if 40 <= len(text) <= 44:
                         text = text.ljust(44, "<")
                     candidates.append(text)
@@ -265,8 +387,9 @@ class HybridOCREngine(IOCREngine):
     def _extract_viz(self, image: np.ndarray) -> str:
         """Extract full visible text using EasyOCR."""
         try:
-            reader = self._get_easyocr()
-            results = reader.readtext(image, paragraph=False)
+            with self._easyocr_lock:
+                reader = self._get_easyocr()
+                results = reader.readtext(image, paragraph=False)
             return " ".join([r[1] for r in results]) if results else ""
         except Exception as e:
             logger.warning(f"EasyOCR VIZ failed: {e}")
@@ -277,6 +400,6 @@ class HybridOCREngine(IOCREngine):
         """Convert YYMMDD → DD.MM.YYYY."""
         if len(yymmdd) != 6 or not yymmdd.isdigit():
             return yymmdd
-        yy, mm, dd = int(yymmdd[:2]), yymmdd[2:4], yymmdd[4:6]
-        year = 2000 + yy if yy < 30 else 1900 + yy
-        return f"{dd}.{mm}.{year}"
+        yy = yymmdd[:2]
+        century = "20" if yy < "30" else "19"  # 00-29 → 2000s, 30-99 → 1900s
+        return f"{yymmdd[4:6]}.{yymmdd[2:4]}.{century}{yy}"
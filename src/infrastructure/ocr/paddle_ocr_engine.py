@@ -7,13 +7,31 @@ campos de documentos brasileiros (nome, CPF, data, RG).
 
 import re
 import logging
-import numpy as np
+from dataclasses import dataclass
 from typing import Any
 
+import cv2
+import numpy as np
+
 from src.core.interfaces.ocr_engine import IOCREngine, OCRResult, OCRField
 
 logger = logging.getLogger(__name__)
 
+# Classe PaddleOCR resolvida uma vez por processo (None = ainda não tentou)
+_PADDLE_CLS: Any = None
+
+
+def _paddle_cls() -> Any:
+    """Importa PaddleOCR sob demanda; devolve False se não estiver instalado."""
+    global _PADDLE_CLS
+    if _PADDLE_CLS is None:
+        try:
+            from paddleocr import PaddleOCR
+            _PADDLE_CLS = PaddleOCR
+        except ImportError:
+            _PADDLE_CLS = False
+    return _PADDLE_CLS
+
 
 # ─── Padrões regex para campos brasileiros ────────────────
 
@@ -24,6 +42,9 @@ PATTERNS = {
     "cnh_registro": re.compile(r"\d{11}"),
 }
 
+# Linha candidata a nome: só letras (com acentos) e espaços
+NAME_LINE_RE = re.compile(r"^[A-ZÀ-Ü\s]+$")
+
 # Palavras-chave que indicam tipo de documento
 DOC_TYPE_KEYWORDS = {
     "RG": ["republica", "identidade", "registro geral", "ssp", "detran", "instituto"],
@@ -31,6 +52,42 @@ DOC_TYPE_KEYWORDS = {
     "CRLV": ["licenciamento", "veiculo", "veículo", "crlv", "renavam"],
 }
 
+# Todas as keywords numa única alternação — uma varredura por linha
+ALL_DOC_KEYWORDS = frozenset(kw for kws in DOC_TYPE_KEYWORDS.values() for kw in kws)
+_KEYWORD_RE = re.compile("|".join(re.escape(kw) for kw in sorted(ALL_DOC_KEYWORDS)))
+
+
+@dataclass
+class OCRLines:
+    """
+    Linhas do OCR em layout colunar (structure-of-arrays).
+
+    Só o texto fica em lista Python; confiança e bbox ficam em arrays
+    contíguos, sem um dict por linha.
+    """
+    texts: list[str]
+    conf: np.ndarray   # (N,) float64
+    bbox: np.ndarray   # (N, 4) int32 — [x1, y1, x2, y2]
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def field(self, idx: int, name: str, value: str, with_bbox: bool = False) -> OCRField:
+        """Cria um OCRField a partir da linha idx."""
+        return OCRField(
+            name=name,
+            value=value,
+            confidence=float(self.conf[idx]),
+            bounding_box=self.bbox[idx].tolist() if with_bbox else None,
+        )
+
+    def to_dicts(self) -> list[dict]:
+        """Formato antigo (lista de dicts) — para debug/serialização."""
+        return [
+            {"text": t, "confidence": float(c), "bbox": b}
+            for t, c, b in zip(self.texts, self.conf, self.bbox.tolist())
+        ]
+
 
 class PaddleOCREngine(IOCREngine):
     """
@@ -50,9 +107,8 @@ class PaddleOCREngine(IOCREngine):
     def _get_engine(self) -> Any:
         """Inicializa PaddleOCR sob demanda."""
         if self._engine is None:
-            try:
-                from paddleocr import PaddleOCR
-
+            PaddleOCR = _paddle_cls()
+            if PaddleOCR:
                 self._engine = PaddleOCR(
                     use_angle_cls=True,
                     lang=self._lang,
@@ -60,7 +116,7 @@ class PaddleOCREngine(IOCREngine):
                     show_log=False,
                 )
                 logger.info("PaddleOCR inicializado com sucesso")
-            except ImportError:
+            else:
                 logger.warning("PaddleOCR não instalado — usando fallback simples")
                 self._engine = "FALLBACK"
         return self._engine
@@ -71,7 +127,6 @@ class PaddleOCREngine(IOCREngine):
 
         # Decodifica imagem
         img_array = np.frombuffer(image_bytes, dtype=np.uint8)
-        import cv2
         img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
 
         if img is None:
@@ -100,26 +155,11 @@ class PaddleOCREngine(IOCREngine):
                 details={"warning": "Nenhum texto detectado"},
             )
 
-        # --- Processar resultados ---
-        lines: list[dict] = []
-        for line in result[0]:
-            bbox = line[0]
-            text = line[1][0]
-            conf = float(line[1][1])
-            lines.append({
-                "text": text,
-                "confidence": conf,
-                "bbox": [
-                    int(bbox[0][0]), int(bbox[0][1]),
-                    int(bbox[2][0]), int(bbox[2][1]),
-                ],
-            })
-
-        raw_text = " ".join(l["text"] for l in lines)
-        avg_conf = sum(l["confidence"] for l in lines) / len(lines) if lines else 0.0
-
-        # --- Pós-processamento: extrair campos ---
-        fields = self._extract_fields(raw_text, lines)
+        # --- Processar resultados + extrair campos (uma única passada) ---
+        lines, fields = self._process_lines(result[0])
+
+        raw_text = " ".join(lines.texts)
+        avg_conf = float(lines.conf.mean()) if len(lines) else 0.0
 
         # --- Tipificar documento ---
         doc_type = doc_type_hint or self._detect_doc_type(raw_text)
@@ -136,58 +176,71 @@ class PaddleOCREngine(IOCREngine):
             },
         )
 
-    def _extract_fields(self, raw_text: str, lines: list[dict]) -> list[OCRField]:
-        """Extrai campos estruturados via regex."""
+    def _process_lines(self, ocr_lines: list) -> tuple[OCRLines, list[OCRField]]:
+        """
+        Monta as linhas e extrai os campos estruturados numa só passada.
+
+        Cada regex roda sobre a linha em que o campo aparece, então a
+        confiança do campo é a da própria linha (sem busca posterior).
+        """
+        n = len(ocr_lines)
+        texts: list[str] = []
+        conf = np.empty(n, dtype=np.float64)
+        bbox = np.empty((n, 4), dtype=np.int32)
+
+        # Campos guardados como (índice da linha, valor) até o fim da passada
+        cpf: tuple[int, str] | None = None
+        rg: tuple[int, str] | None = None
+        dates: list[tuple[int, str]] = []
+        name: tuple[int, str] | None = None
+
+        for idx, line in enumerate(ocr_lines):
+            box = line[0]
+            text = line[1][0]
+            texts.append(text)
+            conf[idx] = line[1][1]
+            bbox[idx] = (box[0][0], box[0][1], box[2][0], box[2][1])
+
+            # CPF
+            if cpf is None:
+                m = PATTERNS["cpf"].search(text)
+                if m:
+                    cpf = (idx, m.group())
+
+            # RG (comparado ao CPF só no fim — o CPF pode vir numa linha posterior)
+            if rg is None:
+                m = PATTERNS["rg"].search(text)
+                if m:
+                    rg = (idx, m.group())
+
+            # Datas
+            for m in PATTERNS["data"].finditer(text):
+                dates.append((idx, m.group()))
+
+            # Nome — heurística: primeira linha que parece nome
+            # (só letras, maiúsculo, >8 chars, sem números)
+            if name is None:
+                stripped = text.strip()
+                if (
+                    len(stripped) > 8
+                    and NAME_LINE_RE.match(stripped.upper())
+                    and not any(c.isdigit() for c in stripped)
+                    and not self._is_keyword(stripped)
+                ):
+                    name = (idx, stripped.upper().strip())
+
+        lines = OCRLines(texts=texts, conf=conf, bbox=bbox)
         fields: list[OCRField] = []
-        text_upper = raw_text.upper()
-
-        # CPF
-        cpf_match = PATTERNS["cpf"].search(raw_text)
-        if cpf_match:
-            fields.append(OCRField(
-                name="cpf",
-                value=cpf_match.group(),
-                confidence=self._get_confidence_for_region(cpf_match.group(), lines),
-            ))
-
-        # RG
-        rg_match = PATTERNS["rg"].search(raw_text)
-        if rg_match and (not cpf_match or rg_match.group() != cpf_match.group()):
-            fields.append(OCRField(
-                name="rg",
-                value=rg_match.group(),
-                confidence=self._get_confidence_for_region(rg_match.group(), lines),
-            ))
-
-        # Datas
-        date_matches = PATTERNS["data"].findall(raw_text)
-        for i, date_str in enumerate(date_matches):
+        if cpf:
+            fields.append(lines.field(cpf[0], "cpf", cpf[1]))
+        if rg and (not cpf or rg[1] != cpf[1]):
+            fields.append(lines.field(rg[0], "rg", rg[1]))
+        for i, (idx, value) in enumerate(dates):
             label = "data_nascimento" if i == 0 else f"data_{i}"
-            fields.append(OCRField(
-                name=label,
-                value=date_str,
-                confidence=self._get_confidence_for_region(date_str, lines),
-            ))
-
-        # Nome — heurística: texto mais longo que parece nome
-        # (só letras, maiúsculo, >5 chars, sem números)
-        for line_data in lines:
-            text = line_data["text"].strip()
-            if (
-                len(text) > 8
-                and re.match(r"^[A-ZÀ-Ü\s]+$", text.upper())
-                and not any(c.isdigit() for c in text)
-                and not self._is_keyword(text)
-            ):
-                fields.append(OCRField(
-                    name="nome",
-                    value=text.upper().strip(),
-                    confidence=line_data["confidence"],
-                    bounding_box=line_data.get("bbox"),
-                ))
-                break  # Pega só o primeiro candidato
-
-        return fields
+            fields.append(lines.field(idx, label, value))
+        if name:
+            fields.append(lines.field(name[0], "nome", name[1], with_bbox=True))
+        return lines, fields
 
     def _detect_doc_type(self, raw_text: str) -> str:
         """Detecta tipo do documento por palavras-chave."""
@@ -202,20 +255,9 @@ class PaddleOCREngine(IOCREngine):
             return max(scores, key=scores.get)
         return "UNKNOWN"
 
-    def _get_confidence_for_region(self, text: str, lines: list[dict]) -> float:
-        """Encontra a confiança da linha que contém o texto."""
-        for line in lines:
-            if text in line["text"]:
-                return line["confidence"]
-        return 0.5  # fallback
-
     def _is_keyword(self, text: str) -> bool:
         """Verifica se o texto é uma keyword de documento (não nome)."""
-        lower = text.lower()
-        all_keywords = []
-        for kws in DOC_TYPE_KEYWORDS.values():
-            all_keywords.extend(kws)
-        return any(kw in lower for kw in all_keywords)
+        return _KEYWORD_RE.search(text.lower()) is not None
 
     def _fallback_extract(self, img: np.ndarray) -> OCRResult:
         """Fallback quando PaddleOCR não está instalado."""
@@ -10,40 +10,266 @@ Supports two modes:
 
 Falls back gracefully when PaddleOCR is not installed.
 """
+import multiprocessing
 import os
 import re
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from statistics import fmean
+from typing import Dict, List, Literal, Optional, Tuple
 
 import numpy as np
 
 from src.core.interfaces.ocr_engine import IOCREngine, OCRResult, OCRField
 from src.infrastructure.data.coco_loader import PassportSample, FieldRegion
+from src.infrastructure.ocr.batch_scheduler import BatchConfig, DynamicBatcher
 
 
 # MRZ character set for filtering
 MRZ_CHARS = set("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789<")
 
+# Bracket-like OCR misreads of the "<" filler. Letter→digit confusions (O/0,
+# I/1, ...) are NOT fixed here: those letters are valid MRZ characters.
+MRZ_FILLER_MISREADS = "()[]{}|"
 
-def _clean_mrz_text(text: str) -> str:
-    """Clean OCR'd MRZ text to valid MRZ characters."""
-    text = text.upper().strip()
-    # Common OCR misreads
-    replacements = {
-        "O": "0", " ": "", "\n": "", "I": "1", "L": "1",
-        "S": "5", "B": "8", "G": "6", "Q": "0",
-        "(": "<", ")": "<", "[": "<", "]": "<",
-        "{": "<", "}": "<", "|": "<",
+
+class _DeleteUnlisted(dict):
+    """str.translate table: listed code points map as given, all others are deleted."""
+
+    def __missing__(self, key):
+        return None
+
+
+_MRZ_TABLE = _DeleteUnlisted(str.maketrans({
+    **{c: c for c in MRZ_CHARS},
+    **{c: "<" for c in MRZ_FILLER_MISREADS},
+}))
+
+# Keeps only MRZ characters — len(text.translate(...)) counts them in C
+_MRZ_ONLY_TABLE = _DeleteUnlisted(str.maketrans({c: c for c in MRZ_CHARS}))
+
+# Field post-processing filters
+_DATE_JUNK_RE = re.compile(r"[^0-9./\-]")
+_NON_ALNUM_RE = re.compile(r"[^A-Za-z0-9]")
+_NON_UPPER_RE = re.compile(r"[^A-Z]")
+_DATE_FIELD_RE = re.compile(r"\d{2}[./\-]\d{2}[./\-]\d{2,4}")
+
+OCR_ENGINE_NAME = "PaddleOCR (passport regions)"
+
+# Recognizer batch size for annotated-region OCR (all field crops go in one call)
+REC_BATCH_SIZE = 16
+
+# CPU inference threads — gains flatten out past ~10 threads per model
+DEFAULT_CPU_THREADS = min(10, os.cpu_count() or 4)
+
+# Detector input cap (longest side): passport scans keep MRZ legible at 1280
+DET_LIMIT_SIDE_LEN = 1280
+
+
+# Inference backends: native Paddle Inference or ONNX Runtime (exported models).
+# PaddleX high-performance inference needs the PaddleOCR 3.x API; this engine
+# uses the 2.x API, so it is not offered.
+OCRBackend = Literal["paddle", "onnx"]
+
+# Exported ONNX models expected under the onnx_model_dir passed to the engine
+ONNX_MODEL_FILES = {"det_model_dir": "det.onnx", "rec_model_dir": "rec.onnx", "cls_model_dir": "cls.onnx"}
+
+
+# PaddleOCR 2.x schema is fixed, so parsing uses plain indexing (no per-line
+# isinstance/len checks); a malformed result raises and the caller's except
+# turns it into an empty OCR result.
+
+def _parse_rec_batch(result, n: int) -> List[Tuple[str, float]]:
+    """Map a det=False PaddleOCR result for n crops to (text, confidence) pairs."""
+    if not result or not result[0]:
+        return [("", 0.0)] * n
+    return [(str(text), float(conf)) for text, conf in result[0]]
+
+
+def _parse_paddle_lines(lines) -> Tuple[list, List[str], List[float]]:
+    """Split det+rec result lines [box, (text, conf)] into boxes, texts, confidences."""
+    boxes = [line[0] for line in lines]
+    texts = [str(line[1][0]) for line in lines]
+    confs = [float(line[1][1]) for line in lines]
+    return boxes, texts, confs
+
+
+# ── Process-wide PaddleOCR instances ────────────────────────────
+# Model load dominates cold-start latency; engines with the same configuration
+# share one loaded model instead of each building their own.
+_PADDLE_CACHE: Dict[Tuple, object] = {}
+_PADDLE_CACHE_LOCK = threading.Lock()
+
+
+def _paddle_option_names() -> Optional[set]:
+    """
+    Constructor options the installed PaddleOCR 2.x actually reads, or None if
+    they can't be determined. PaddleOCR 2.x copies unknown kwargs into its
+    params without complaint, so an unsupported option would be silently ignored.
+    """
+    try:
+        import paddleocr  # noqa: F401  (puts its bundled `tools` package on sys.path)
+        from tools.infer.utility import init_args
+    except ImportError:
+        return None
+    return {action.dest for action in init_args()._actions}
+
+
+def _backend_kwargs(backend: str, use_gpu: bool, onnx_model_dir: Optional[str]) -> dict:
+    """
+    Extra PaddleOCR kwargs for the requested backend, or {} to fall back to
+    native Paddle when the fast path is not available in this environment.
+    """
+    if backend == "paddle":
+        return {}
+    if backend != "onnx":
+        print(f"[WARN] OCR backend {backend!r} not supported. Using Paddle backend.")
+        return {}
+
+    options = _paddle_option_names()
+    if options is None or "use_onnx" not in options:
+        print("[WARN] Installed PaddleOCR has no ONNX Runtime support (use_onnx). Using Paddle backend.")
+        return {}
+    try:
+        import onnxruntime  # noqa: F401
+    except ImportError:
+        print("[WARN] onnxruntime not installed. Using Paddle backend.")
+        return {}
+    paths = {k: os.path.join(onnx_model_dir or "", f) for k, f in ONNX_MODEL_FILES.items()}
+    if not onnx_model_dir or not all(os.path.exists(p) for p in paths.values()):
+        print(f"[WARN] ONNX models not found in {onnx_model_dir!r}. Using Paddle backend.")
+        return {}
+
+    kwargs = {"use_onnx": True, **paths}
+    if "onnx_providers" in options:
+        kwargs["onnx_providers"] = ["CUDAExecutionProvider" if use_gpu else "CPUExecutionProvider"]
+    elif use_gpu:
+        print("[WARN] Installed PaddleOCR can't select ONNX providers; onnxruntime uses its default.")
+    return kwargs
+
+
+def _warmup_gpu(ocr):
+    """
+    Dummy det+rec and batched rec passes so CUDA/cuDNN kernel selection and
+    memory-pool growth happen at load time instead of on the first document.
+    """
+    try:
+        ocr.ocr(np.zeros((256, 256, 3), dtype=np.uint8), cls=True)
+        ocr.ocr([[np.zeros((48, 192, 3), dtype=np.uint8)] * REC_BATCH_SIZE], det=False, cls=True)
+    except Exception as e:
+        print(f"[WARN] PaddleOCR GPU warmup failed: {e}")
+
+
+def _build_paddle(
+    lang: str,
+    use_gpu: bool,
+    cpu_threads: int = DEFAULT_CPU_THREADS,
+    rec_batch_num: int = REC_BATCH_SIZE,
+    backend: OCRBackend = "paddle",
+    onnx_model_dir: Optional[str] = None,
+    gpu_mem_mb: Optional[int] = None,
+):
+    """
+    Build a PaddleOCR with the tuned kwargs and requested backend, falling back
+    to native Paddle / default kwargs. Used by _shared_paddle and region workers.
+    gpu_mem_mb: initial GPU memory pool (MB); None keeps Paddle's default.
+    """
+    from paddleocr import PaddleOCR
+    base = {"use_angle_cls": True, "lang": lang, "use_gpu": use_gpu, "show_log": False}
+    tuned = {
+        "enable_mkldnn": not use_gpu,
+        "cpu_threads": cpu_threads,
+        "rec_batch_num": rec_batch_num,
+        "det_limit_side_len": DET_LIMIT_SIDE_LEN,
+        "det_limit_type": "max",
     }
-    # Only apply replacements in numeric positions
-    # For now, just clean invalid chars
-    result = ""
-    for c in text:
-        if c in MRZ_CHARS:
-            result += c
-        elif c in replacements:
-            result += replacements[c]
-    return result
+    if use_gpu and gpu_mem_mb is not None:
+        tuned["gpu_mem"] = gpu_mem_mb
+    fast = _backend_kwargs(backend, use_gpu, onnx_model_dir)
+    if fast:
+        try:
+            return PaddleOCR(**base, **tuned, **fast)
+        except (TypeError, ImportError, RuntimeError) as e:
+            print(f"[WARN] {backend} backend unavailable ({e}). Using Paddle backend.")
+    try:
+        return PaddleOCR(**base, **tuned)
+    except TypeError:
+        # Older PaddleOCR builds reject some tuning kwargs
+        print("[WARN] PaddleOCR rejected tuning options, using defaults.")
+        return PaddleOCR(**base)
+
+
+def _shared_paddle(
+    lang: str,
+    use_gpu: bool,
+    cpu_threads: int = DEFAULT_CPU_THREADS,
+    rec_batch_num: int = REC_BATCH_SIZE,
+    backend: OCRBackend = "paddle",
+    onnx_model_dir: Optional[str] = None,
+    gpu_mem_mb: Optional[int] = None,
+):
+    """Return the cached PaddleOCR for this configuration, loading it on first use."""
+    key = (lang, use_gpu, cpu_threads, rec_batch_num, backend, onnx_model_dir, gpu_mem_mb)
+    with _PADDLE_CACHE_LOCK:
+        ocr = _PADDLE_CACHE.get(key)
+        if ocr is None:
+            ocr = _build_paddle(
+                lang, use_gpu, cpu_threads, rec_batch_num, backend, onnx_model_dir, gpu_mem_mb,
+            )
+            if use_gpu:
+                _warmup_gpu(ocr)
+            _PADDLE_CACHE[key] = ocr
+        return ocr
+
+
+# ── Region-OCR worker processes (CPU only) ──────────────────────
+# Each worker owns its own PaddleOCR instance, created once by the pool initializer.
+_WORKER_OCR = None
+
+
+def _init_region_worker(
+    lang: str,
+    cpu_threads: int,
+    rec_batch_num: int,
+    backend: OCRBackend,
+    onnx_model_dir: Optional[str],
+):
+    global _WORKER_OCR
+    # Same kwargs/backend/fallbacks as the main-process model (only the thread count differs)
+    _WORKER_OCR = _build_paddle(lang, False, cpu_threads, rec_batch_num, backend, onnx_model_dir)
+
+
+def _recognize_chunk(crops: List[np.ndarray]) -> List[Tuple[str, float]]:
+    try:
+        return _parse_rec_batch(_WORKER_OCR.ocr([crops], det=False, cls=True), len(crops))
+    except Exception as e:
+        print(f"[WARN] Region OCR failed in worker {os.getpid()}: {e!r}")
+        return [("", 0.0)] * len(crops)
+
+
+def _passport_result(
+    raw_text: str,
+    fields: List[OCRField],
+    avg_confidence: float,
+    extracted: Dict[str, str],
+) -> OCRResult:
+    """OCRResult for this engine; per-field text (regions joined) goes in details."""
+    return OCRResult(
+        raw_text=raw_text,
+        fields=fields,
+        avg_confidence=round(avg_confidence, 3),
+        doc_type_detected="passport",
+        ocr_engine=OCR_ENGINE_NAME,
+        details={"extracted_fields": extracted},
+    )
+
+
+def _clean_mrz_text(text: str) -> str:
+    """Clean OCR'd MRZ text to valid MRZ characters (one C-level translate pass)."""
+    return text.upper().translate(_MRZ_TABLE)
 
 
 class PassportOCREngine(IOCREngine):
@@ -55,31 +281,79 @@ class PassportOCREngine(IOCREngine):
     When no annotations are available, falls back to full-image OCR.
     """
 
-    def __init__(self, lang: str = "en", use_gpu: bool = False):
+    # Threads per worker process; workers default to cpu_count // 4
+    WORKER_CPU_THREADS = 2
+
+    def __init__(
+        self,
+        lang: str = "en",
+        use_gpu: bool = False,
+        region_workers: Optional[int] = None,
+        cpu_threads: int = DEFAULT_CPU_THREADS,
+        rec_batch_num: int = REC_BATCH_SIZE,
+        backend: OCRBackend = "paddle",
+        onnx_model_dir: Optional[str] = None,
+        batch_config: Optional[BatchConfig] = None,
+        gpu_mem_mb: Optional[int] = None,
+    ):
         self.lang = lang
         self.use_gpu = use_gpu
+        self.cpu_threads = cpu_threads
+        self.rec_batch_num = rec_batch_num
+        self.backend = backend
+        self.onnx_model_dir = onnx_model_dir
+        # Initial Paddle GPU memory pool (MB); None = Paddle's default (size it per card)
+        self.gpu_mem_mb = gpu_mem_mb
+        self.region_workers = (
+            region_workers if region_workers is not None else (os.cpu_count() or 1) // 4
+        )
         self._ocr = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.batch_config = batch_config
+        self._batcher: Optional[DynamicBatcher] = None
         self._initialized = False
 
     def _init_ocr(self):
-        """Lazy initialization of PaddleOCR."""
+        """Lazy initialization of PaddleOCR (shared process-wide, see _shared_paddle)."""
         if self._initialized:
             return
 
         try:
-            from paddleocr import PaddleOCR
-            self._ocr = PaddleOCR(
-                use_angle_cls=True,
-                lang=self.lang,
-                use_gpu=self.use_gpu,
-                show_log=False,
+            self._ocr = _shared_paddle(
+                self.lang, self.use_gpu, self.cpu_threads, self.rec_batch_num,
+                self.backend, self.onnx_model_dir, self.gpu_mem_mb,
             )
         except ImportError:
             print("[WARN] PaddleOCR not installed. Using stub OCR.")
             self._ocr = None
 
+        # CPU: fan region OCR out to worker processes (threads serialize on the GIL).
+        # GPU stays single-process and relies on the batched recognizer call.
+        if self._ocr is not None and not self.use_gpu and self.region_workers >= 2:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.region_workers,
+                mp_context=multiprocessing.get_context("spawn"),  # paddle is not fork-safe
+                initializer=_init_region_worker,
+                initargs=(
+                    self.lang, self.WORKER_CPU_THREADS, self.rec_batch_num,
+                    self.backend, self.onnx_model_dir,
+                ),
+            )
+
         self._initialized = True
 
+    def close(self):
+        """Shut down the region worker pool, if any."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def __enter__(self) -> "PassportOCREngine":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
     def extract(self, image: np.ndarray) -> OCRResult:
         """
         Extract text from a passport image (full image, no annotations).
@@ -100,164 +374,180 @@ class PassportOCREngine(IOCREngine):
         OCRs it individually for much better accuracy.
         """
         self._init_ocr()
+        crops, metas = self._crop_regions(image, sample)
+        return self._build_region_result(metas, self._ocr_regions(crops))
 
-        fields = []
-        extracted = {}
-        confidences = []
-
-        for field_name, regions in sample.fields.items():
-            for region in regions:
-                x1, y1, x2, y2 = region.to_xyxy()
+    async def extract_with_regions_async(
+        self,
+        image: np.ndarray,
+        sample: PassportSample,
+    ) -> OCRResult:
+        """
+        Async variant of extract_with_regions for concurrent documents.
 
-                # Add padding (5% of region size)
-                pad_x = max(5, int((x2 - x1) * 0.05))
-                pad_y = max(3, int((y2 - y1) * 0.1))
+        Crops go through a shared DynamicBatcher, so crops from several
+        in-flight documents are recognized together in one batched call.
+        """
+        self._init_ocr()
+        crops, metas = self._crop_regions(image, sample)
+        ocr_results = await self._get_batcher().submit_many(crops)
+        return self._build_region_result(metas, ocr_results)
 
-                # Clamp to image bounds
-                h, w = image.shape[:2]
-                x1 = max(0, x1 - pad_x)
-                y1 = max(0, y1 - pad_y)
-                x2 = min(w, x2 + pad_x)
-                y2 = min(h, y2 + pad_y)
+    def _get_batcher(self) -> DynamicBatcher:
+        if self._batcher is None:
+            self._batcher = DynamicBatcher(self._ocr_regions, self.batch_config)
+        return self._batcher
 
-                # Crop
+    def _crop_regions(
+        self,
+        image: np.ndarray,
+        sample: PassportSample,
+    ) -> Tuple[List[np.ndarray], List[Tuple[str, List[int]]]]:
+        """Crop every annotated region (no OCR yet)."""
+        crops: List[np.ndarray] = []
+        metas: List[Tuple[str, List[int]]] = []
+
+        names = [name for name, regions in sample.fields.items() for _ in regions]
+        if names:
+            boxes = np.array(
+                [region.to_xyxy() for regions in sample.fields.values() for region in regions],
+                dtype=np.int64,
+            )
+            for name, bbox in zip(names, self._pad_and_clamp(boxes, image.shape).tolist()):
+                x1, y1, x2, y2 = bbox
                 crop = image[y1:y2, x1:x2]
                 if crop.size == 0:
                     continue
+                crops.append(crop)
+                metas.append((name, bbox))
+
+        return crops, metas
 
-                # OCR the cropped region
-                text, confidence = self._ocr_region(crop, field_name)
+    def _build_region_result(
+        self,
+        metas: List[Tuple[str, List[int]]],
+        ocr_results: List[Tuple[str, float]],
+    ) -> OCRResult:
+        """Per-field post-processing of recognized regions."""
+        fields = []
+        extracted_parts: Dict[str, List[str]] = defaultdict(list)
+        confidences = []
 
-                if text:
-                    # Post-process based on field type
-                    text = self._post_process_field(field_name, text)
+        for (field_name, bbox), (text, confidence) in zip(metas, ocr_results):
+            if text:
+                # Post-process based on field type
+                text = self._post_process_field(field_name, text)
 
-                    ocr_field = OCRField(
-                        name=field_name,
-                        value=text,
-                        confidence=confidence,
-                        bbox=[x1, y1, x2, y2],
-                    )
-                    fields.append(ocr_field)
+                ocr_field = OCRField(
+                    name=field_name,
+                    value=text,
+                    confidence=confidence,
+                    bounding_box=bbox,
+                )
+                fields.append(ocr_field)
 
-                    # Store in extracted dict (append if multiple regions)
-                    if field_name in extracted:
-                        extracted[field_name] += " " + text
-                    else:
-                        extracted[field_name] = text
+                # Collect per field (joined once below if multiple regions)
+                extracted_parts[field_name].append(text)
 
-                    confidences.append(confidence)
+                confidences.append(confidence)
 
+        extracted = {name: " ".join(parts) for name, parts in extracted_parts.items()}
         avg_confidence = (
             sum(confidences) / len(confidences) if confidences else 0.0
         )
 
-        return OCRResult(
-            full_text="\n".join(f"{f.name}: {f.value}" for f in fields),
-            fields=fields,
-            confidence=round(avg_confidence, 3),
-            extracted_fields=extracted,
-            document_type="passport",
+        return _passport_result(
+            "\n".join(f"{f.name}: {f.value}" for f in fields), fields, avg_confidence, extracted,
         )
 
-    def _ocr_region(
-        self, crop: np.ndarray, field_name: str
-    ) -> Tuple[str, float]:
-        """OCR a single cropped region."""
-        if self._ocr is None:
-            return ("", 0.0)
-
-        try:
-            result = self._ocr.ocr(crop, cls=True)
-            if not result or not result[0]:
-                return ("", 0.0)
-
-            # Combine all detected text in the region
-            texts = []
-            confs = []
-            for line in result[0]:
-                if line and len(line) >= 2:
-                    text_info = line[1]
-                    if isinstance(text_info, tuple) and len(text_info) >= 2:
-                        texts.append(str(text_info[0]))
-                        confs.append(float(text_info[1]))
+    @staticmethod
+    def _pad_and_clamp(boxes: np.ndarray, shape: Tuple[int, ...]) -> np.ndarray:
+        """
+        Pad (N, 4) xyxy boxes and clamp them to the image, all regions at once.
 
-            combined_text = " ".join(texts)
-            avg_conf = sum(confs) / len(confs) if confs else 0.0
+        Padding: 5% of width (min 5 px) and 10% of height (min 3 px).
+        """
+        h, w = shape[:2]
+        x1, y1, x2, y2 = boxes.T
+        pad_x = np.maximum(5, ((x2 - x1) * 0.05).astype(np.int64))
+        pad_y = np.maximum(3, ((y2 - y1) * 0.1).astype(np.int64))
+        return np.stack([
+            np.maximum(0, x1 - pad_x),
+            np.maximum(0, y1 - pad_y),
+            np.minimum(w, x2 + pad_x),
+            np.minimum(h, y2 + pad_y),
+        ], axis=1)
+
+    def _ocr_regions(self, crops: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """
+        Recognize pre-cropped field regions in a single batched call.
 
-            return (combined_text, avg_conf)
+        Regions are already cropped from the annotations, so detection is
+        skipped (det=False) and the crops go to the recognizer as one batch
+        (split internally by rec_batch_num). On CPU with a worker pool the
+        crops are split into one chunk per worker and recognized in parallel.
+        """
+        empty = [("", 0.0)] * len(crops)
+        if self._ocr is None or not crops:
+            return empty
+
+        pool = self._pool
+        if pool is not None and len(crops) >= 2:
+            n_chunks = min(self.region_workers, len(crops))
+            size = -(-len(crops) // n_chunks)  # ceil
+            chunks = [crops[i:i + size] for i in range(0, len(crops), size)]
+            try:
+                return [r for chunk in pool.map(_recognize_chunk, chunks) for r in chunk]
+            except BrokenProcessPool as e:
+                # A worker died: stop using the pool and recognize in-process from now on
+                print(f"[WARN] Region OCR worker pool broken ({e}). Falling back to in-process OCR.")
+                pool.shutdown(wait=False)
+                self._pool = None
+            except Exception as e:
+                print(f"[WARN] Region OCR worker pool failed ({e!r}). Retrying in-process.")
 
+        try:
+            # A list nested in a list is fed to the recognizer as one batch
+            return _parse_rec_batch(self._ocr.ocr([crops], det=False, cls=True), len(crops))
         except Exception as e:
-            return ("", 0.0)
+            # Recognizer error or malformed result — distinct from a crop with no text
+            print(f"[WARN] Region OCR failed for {len(crops)} crops: {e!r}")
+            return empty
 
     def _ocr_full_image(self, image: np.ndarray) -> OCRResult:
         """Fallback: OCR the entire image."""
         if self._ocr is None:
-            return OCRResult(
-                full_text="[PaddleOCR not available]",
-                fields=[],
-                confidence=0.0,
-                extracted_fields={},
-                document_type="passport",
-            )
+            return _passport_result("[PaddleOCR not available]", [], 0.0, {})
 
         try:
             result = self._ocr.ocr(image, cls=True)
             if not result or not result[0]:
-                return OCRResult(
-                    full_text="",
-                    fields=[],
-                    confidence=0.0,
-                    extracted_fields={},
-                    document_type="passport",
-                )
+                return _passport_result("", [], 0.0, {})
 
-            all_texts = []
-            all_confs = []
-            fields = []
-
-            for line in result[0]:
-                if line and len(line) >= 2:
-                    bbox_points = line[0]
-                    text_info = line[1]
-                    if isinstance(text_info, tuple):
-                        text = str(text_info[0])
-                        conf = float(text_info[1])
-
-                        all_texts.append(text)
-                        all_confs.append(conf)
-
-                        # Try to auto-detect field type from position/content
-                        field_name = self._guess_field_name(text)
-                        fields.append(OCRField(
-                            name=field_name,
-                            value=text,
-                            confidence=conf,
-                            bbox=self._flatten_bbox(bbox_points),
-                        ))
+            boxes, all_texts, all_confs = _parse_paddle_lines(result[0])
+
+            # Try to auto-detect field type from position/content
+            fields = [
+                OCRField(
+                    name=self._guess_field_name(text),
+                    value=text,
+                    confidence=conf,
+                    bounding_box=self._flatten_bbox(bbox_points),
+                )
+                for bbox_points, text, conf in zip(boxes, all_texts, all_confs)
+            ]
 
             full_text = "\n".join(all_texts)
-            avg_conf = sum(all_confs) / len(all_confs) if all_confs else 0.0
+            avg_conf = fmean(all_confs) if all_confs else 0.0
 
             # Try to extract MRZ from full text
             extracted = self._extract_mrz_from_text(full_text)
 
-            return OCRResult(
-                full_text=full_text,
-                fields=fields,
-                confidence=round(avg_conf, 3),
-                extracted_fields=extracted,
-                document_type="passport",
-            )
+            return _passport_result(full_text, fields, avg_conf, extracted)
 
-        except Exception:
-            return OCRResult(
-                full_text="",
-                fields=[],
-                confidence=0.0,
-                extracted_fields={},
-                document_type="passport",
-            )
+        except Exception as e:
+            print(f"[WARN] Full-image OCR failed: {e!r}")
+            return _passport_result("", [], 0.0, {})
 
     def _post_process_field(self, field_name: str, text: str) -> str:
         """Clean up OCR'd text based on field type."""
@@ -269,7 +559,7 @@ class PassportOCREngine(IOCREngine):
 
         elif field_name in ("date_of_birth", "date_of_issue", "date_of_expiry"):
             # Keep only digits, dots, slashes, dashes
-            text = re.sub(r"[^0-9./\-]", "", text)
+            text = _DATE_JUNK_RE.sub("", text)
 
         elif field_name == "sex":
             text = text.upper()
@@ -278,11 +568,11 @@ class PassportOCREngine(IOCREngine):
 
         elif field_name in ("document_number", "personal_number"):
             # Keep alphanumeric
-            text = re.sub(r"[^A-Za-z0-9]", "", text)
+            text = _NON_ALNUM_RE.sub("", text)
 
         elif field_name in ("issuing_state_code", "nationality"):
             text = text.upper().strip()
-            text = re.sub(r"[^A-Z]", "", text)[:3]
+            text = _NON_UPPER_RE.sub("", text)[:3]
 
         return text
 
@@ -297,7 +587,7 @@ class PassportOCREngine(IOCREngine):
             return "mrz_lower_line"
 
         # Date pattern
-        if re.match(r"\d{2}[./\-]\d{2}[./\-]\d{2,4}", text):
+        if _DATE_FIELD_RE.match(text):
             return "date_field"
 
         return "unknown"
@@ -312,7 +602,7 @@ class PassportOCREngine(IOCREngine):
             clean = line.strip().upper()
             # MRZ lines are 44 chars and mostly contain valid MRZ chars
             if len(clean) >= 30:
-                mrz_ratio = sum(1 for c in clean if c in MRZ_CHARS) / len(clean)
+                mrz_ratio = len(clean.translate(_MRZ_ONLY_TABLE)) / len(clean)
                 if mrz_ratio > 0.8:
                     mrz_lines.append(_clean_mrz_text(clean))
 
@@ -8,17 +8,58 @@ Avalia qualidade de imagem usando 4 métricas de CV clássico:
   4. Enquadramento → % da área ocupada pelo documento
 """
 
-import cv2
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
 from src.core.interfaces.quality_gate import IQualityGate, QualityResult
 
+# cv2 é importado no primeiro uso (100-300 ms de import no cold start do worker)
+_cv2 = None
+
+
+def _get_cv2():
+    global _cv2
+    if _cv2 is None:
+        import cv2
+        _cv2 = cv2
+    return _cv2
+
+
+# libjpeg-turbo (SIMD IDCT) para JPEG, quando disponível — o cv2 de muitas
+# distros usa libjpeg simples. Sem a lib nativa, tudo passa pelo cv2.
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    _TJ = TurboJPEG()
+except Exception:  # pacote ausente ou libturbojpeg não encontrada
+    _TJ = None
+
+_JPEG_MAGIC = b"\xff\xd8\xff"
+
+
+def _decode_image(image_bytes: bytes) -> np.ndarray | None:
+    """Decodifica para BGR uint8: TurboJPEG para JPEG, cv2 para o resto (ou em erro)."""
+    if _TJ is not None and image_bytes[:3] == _JPEG_MAGIC:
+        try:
+            return _TJ.decode(image_bytes, pixel_format=TJPF_BGR)
+        except Exception:
+            pass
+    cv2 = _get_cv2()
+    img_array = np.frombuffer(image_bytes, dtype=np.uint8)
+    return cv2.imdecode(img_array, cv2.IMREAD_COLOR)
+
 
 class OpenCVQualityGate(IQualityGate):
     """
     Quality Gate usando OpenCV puro — rápido (~5ms), determinístico, auditável.
     """
 
+    # Blur, brilho e enquadramento são independentes e o OpenCV libera o GIL
+    # nas rotinas em C — um pool compartilhado roda as três em paralelo
+    _pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="quality-gate")
+    # Abaixo disso o custo de despachar para threads supera o trabalho
+    PARALLEL_MIN_PIXELS = 640 * 480
+
     def __init__(
         self,
         blur_threshold: float = 100.0,
@@ -26,17 +67,30 @@ class OpenCVQualityGate(IQualityGate):
         brightness_max: int = 220,
         min_resolution: int = 640,
         min_doc_area_ratio: float = 0.05,
+        parallel: bool = True,
+        reject_below_resolution: int | None = None,
+        analysis_max_side: int = 0,
     ):
         self._blur_threshold = blur_threshold
         self._brightness_min = brightness_min
         self._brightness_max = brightness_max
         self._min_resolution = min_resolution
         self._min_doc_area_ratio = min_doc_area_ratio
+        self._parallel = parallel
+        # >0: métricas rodam numa cópia reduzida (lado maior ≤ este valor).
+        # Desligado por padrão — os thresholds foram calibrados em resolução cheia.
+        self._analysis_max_side = analysis_max_side
+        # Thumbnails abaixo disso são RECAPTURE direto, sem rodar as métricas
+        # (padrão: metade da resolução mínima). Muda a decisão: uma imagem limpa
+        # nessa faixa antes recebia REVIEW (só LOW_RESOLUTION); agora é RECAPTURE.
+        self._reject_below_resolution = (
+            reject_below_resolution if reject_below_resolution is not None else min_resolution // 2
+        )
 
     def evaluate(self, image_bytes: bytes) -> QualityResult:
         """Avalia a qualidade da imagem e retorna score + flags."""
-        img_array = np.frombuffer(image_bytes, dtype=np.uint8)
-        img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
+        cv2 = _get_cv2()
+        img = _decode_image(image_bytes)
 
         if img is None:
             return QualityResult(
@@ -47,17 +101,52 @@ class OpenCVQualityGate(IQualityGate):
                 details={"error": "Não foi possível decodificar a imagem"},
             )
 
+        # --- Fast path: thumbnail óbvio (shape é gratuito; métricas não) ---
+        h, w = img.shape[:2]
+        min_side = min(h, w)
+        if min_side < self._reject_below_resolution:
+            # Score só com o termo de resolução; blur/brilho/enquadramento não calculados
+            resolution_score = self.SCORE_WEIGHTS[3] * min(min_side / self.SCORE_SCALES[3], 1.0)
+            return QualityResult(
+                quality_ok=False,
+                quality_score=round(float(resolution_score), 3),
+                reasons=["LOW_RESOLUTION"],
+                recommendation="RECAPTURE",
+                details={
+                    "resolution_min_side": min_side,
+                    "resolution": f"{w}x{h}",
+                    "metrics_not_computed": ["blur", "brightness", "framing"],
+                },
+            )
+
         reasons: list[str] = []
         scores: dict[str, float] = {}
 
+        # Resolução é sempre medida no original; as métricas podem usar a cópia reduzida
+        img = self._downsample(img)
+
+        # Grayscale calculado uma vez — reutilizado por blur e enquadramento
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+        # Métricas de imagem (blur, brilho, enquadramento) — em paralelo se valer a pena
+        if self._parallel and gray.size >= self.PARALLEL_MIN_PIXELS:
+            f_blur = self._pool.submit(self._check_blur, gray)
+            f_bright = self._pool.submit(self._check_brightness, img)
+            f_frame = self._pool.submit(self._check_framing, gray)
+            blur_score = f_blur.result()
+            brightness, brightness_std = f_bright.result()
+            doc_area_ratio = f_frame.result()
+        else:
+            blur_score = self._check_blur(gray)
+            brightness, brightness_std = self._check_brightness(img)
+            doc_area_ratio = self._check_framing(gray)
+
         # --- 1. Blur (variância do Laplaciano) ---
-        blur_score = self._check_blur(img)
         scores["blur_score"] = round(blur_score, 2)
         if blur_score < self._blur_threshold:
             reasons.append("BLUR_HIGH")
 
         # --- 2. Iluminação (brilho) ---
-        brightness, brightness_std = self._check_brightness(img)
         scores["brightness_mean"] = round(brightness, 2)
         scores["brightness_std"] = round(brightness_std, 2)
         if brightness < self._brightness_min:
@@ -68,15 +157,12 @@ class OpenCVQualityGate(IQualityGate):
             reasons.append("LOW_CONTRAST")
 
         # --- 3. Resolução ---
-        h, w = img.shape[:2]
-        min_side = min(h, w)
         scores["resolution_min_side"] = min_side
         scores["resolution"] = f"{w}x{h}"
         if min_side < self._min_resolution:
             reasons.append("LOW_RESOLUTION")
 
         # --- 4. Enquadramento (documento ocupa área suficiente?) ---
-        doc_area_ratio = self._check_framing(img)
         scores["doc_area_ratio"] = round(doc_area_ratio, 3)
         if doc_area_ratio < self._min_doc_area_ratio:
             reasons.append("CROP_PARTIAL")
@@ -104,36 +190,68 @@ class OpenCVQualityGate(IQualityGate):
 
     # ─── Métodos internos ──────────────────────────────────
 
-    def _check_blur(self, img: np.ndarray) -> float:
+    def _downsample(self, img: np.ndarray) -> np.ndarray:
+        """Reduz uma vez (INTER_AREA) para o lado maior caber em analysis_max_side."""
+        cv2 = _get_cv2()
+        if self._analysis_max_side <= 0:
+            return img
+        scale = self._analysis_max_side / max(img.shape[:2])
+        if scale >= 1.0:
+            return img
+        return cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    def _check_blur(self, gray: np.ndarray) -> float:
         """
-        Variância do Laplaciano — quanto maior, mais nítido.
+        Variância do Laplaciano (imagem em escala de cinza) — quanto maior, mais nítido.
         Típico: >300 = nítido, <100 = borrado.
         """
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        laplacian = cv2.Laplacian(gray, cv2.CV_64F)
-        return float(laplacian.var())
+        cv2 = _get_cv2()
+        # ksize=1 on uint8 fits in int16 (|Δ| ≤ 1020): 2 bytes/px instead of 8,
+        # and meanStdDev gives the variance in a single pass
+        laplacian = cv2.Laplacian(gray, cv2.CV_16S, ksize=1)
+        _, std = cv2.meanStdDev(laplacian)
+        return float(std[0, 0] ** 2)
 
     def _check_brightness(self, img: np.ndarray) -> tuple[float, float]:
         """
         Média e desvio padrão do canal V (HSV).
         Retorna (mean, std).
+
+        V = max(B, G, R) — calculado direto, sem a conversão HSV completa
+        (H e S não são usados).
         """
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-        v_channel = hsv[:, :, 2]
-        return float(v_channel.mean()), float(v_channel.std())
+        cv2 = _get_cv2()
+        b, g, r = cv2.split(img)
+        v_channel = cv2.max(cv2.max(b, g), r)
+        mean, std = cv2.meanStdDev(v_channel)
+        return float(mean[0, 0]), float(std[0, 0])
+
+    # Ratio a partir do qual framing_norm (ratio / 0.9) já satura em 1.0 —
+    # estratégias seguintes não mudam o score, então a busca para aí
+    FRAMING_EARLY_EXIT = 0.9
+    CANNY_THRESHOLDS = ((30, 100), (50, 150), (75, 200))
 
-    def _check_framing(self, img: np.ndarray) -> float:
+    def _check_framing(self, gray: np.ndarray) -> float:
         """
-        Estimate document area ratio using multiple strategies.
-        Returns ratio 0.0 to 1.0 — best result from 3 methods.
+        Estimate document area ratio using multiple strategies (grayscale input).
+        Returns ratio 0.0 to 1.0 — best result from 3 methods, stopping early
+        once a strategy reaches FRAMING_EARLY_EXIT.
         """
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        image_area = img.shape[0] * img.shape[1]
+        image_area = gray.shape[0] * gray.shape[1]
         if image_area == 0:
             return 0.0
 
-        ratios = []
+        best = 0.0
+        for ratio in self._framing_candidates(gray, image_area):
+            if ratio > best:
+                best = ratio
+                if best >= self.FRAMING_EARLY_EXIT:
+                    break
+        return best
 
+    def _framing_candidates(self, gray: np.ndarray, image_area: int):
+        """Yield area ratios strategy by strategy (cheapest/most reliable first)."""
+        cv2 = _get_cv2()
         # Strategy 1: Adaptive threshold + largest contour
         try:
             thresh = cv2.adaptiveThreshold(
@@ -145,16 +263,16 @@ class OpenCVQualityGate(IQualityGate):
             contours, _ = cv2.findContours(closed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
             if contours:
                 largest = max(contours, key=cv2.contourArea)
-                ratios.append(cv2.contourArea(largest) / image_area)
+                yield cv2.contourArea(largest) / image_area
         except Exception:
             pass
 
-        # Strategy 2: Multi-scale Canny + contour approximation
+        # Strategy 2: Multi-scale Canny + contour approximation (blur computed once)
         try:
             blurred = cv2.GaussianBlur(gray, (7, 7), 0)
-            for lo, hi in [(30, 100), (50, 150), (75, 200)]:
+            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (9, 9))
+            for lo, hi in self.CANNY_THRESHOLDS:
                 edges = cv2.Canny(blurred, lo, hi)
-                kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (9, 9))
                 dilated = cv2.dilate(edges, kernel, iterations=3)
                 contours, _ = cv2.findContours(dilated, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
                 if contours:
@@ -163,9 +281,9 @@ class OpenCVQualityGate(IQualityGate):
                     peri = cv2.arcLength(largest, True)
                     approx = cv2.approxPolyDP(largest, 0.02 * peri, True)
                     if 4 <= len(approx) <= 8:
-                        ratios.append(cv2.contourArea(approx) / image_area)
+                        yield cv2.contourArea(approx) / image_area
                     else:
-                        ratios.append(cv2.contourArea(largest) / image_area)
+                        yield cv2.contourArea(largest) / image_area
         except Exception:
             pass
 
@@ -176,11 +294,14 @@ class OpenCVQualityGate(IQualityGate):
             # Document images typically have 3-15% edge density
             # Non-document (blank wall, sky) has <1%
             if edge_density > 0.02:
-                ratios.append(min(edge_density * 8, 1.0))  # Scale to 0-1
+                yield min(edge_density * 8, 1.0)  # Scale to 0-1
         except Exception:
             pass
 
-        return max(ratios) if ratios else 0.0
+    # Pesos do score: blur, brilho, contraste, resolução, enquadramento
+    SCORE_WEIGHTS = np.array([0.30, 0.20, 0.10, 0.15, 0.25])
+    # Valor de cada métrica que já conta como 1.0 (brilho: desvio de 128)
+    SCORE_SCALES = np.array([500.0, 128.0, 70.0, 1280.0, 0.9])
 
     def _compute_quality_score(
         self,
@@ -193,23 +314,20 @@ class OpenCVQualityGate(IQualityGate):
         """
         Score composto 0.0-1.0 (média ponderada das métricas normalizadas).
         """
-        # Normaliza cada métrica para 0-1
-        blur_norm = min(blur / 500.0, 1.0)
+        metrics = np.array([[blur, brightness, brightness_std, min_side, doc_ratio]], dtype=np.float64)
+        return float(self.compute_quality_score_batch(metrics)[0])
 
+    @classmethod
+    def compute_quality_score_batch(cls, metrics: np.ndarray) -> np.ndarray:
+        """
+        Score para N imagens de uma vez (ex.: frames de vídeo).
+
+        metrics: (N, 5) — blur, brightness, brightness_std, min_side, doc_ratio.
+        Retorna (N,) com scores em 0.0-1.0 (um único matmul com os pesos).
+        """
+        m = np.asarray(metrics, dtype=np.float64)
+        # Normaliza cada métrica para 0-1
+        norm = np.minimum(m / cls.SCORE_SCALES, 1.0)
         # Brilho ideal ~128, penaliza extremos
-        brightness_norm = 1.0 - abs(brightness - 128.0) / 128.0
-        brightness_norm = max(brightness_norm, 0.0)
-
-        contrast_norm = min(brightness_std / 70.0, 1.0)
-        resolution_norm = min(min_side / 1280.0, 1.0)
-        framing_norm = min(doc_ratio / 0.9, 1.0)
-
-        # Pesos
-        score = (
-            blur_norm * 0.30
-            + brightness_norm * 0.20
-            + contrast_norm * 0.10
-            + resolution_norm * 0.15
-            + framing_norm * 0.25
-        )
-        return max(0.0, min(score, 1.0))
+        norm[:, 1] = np.maximum(1.0 - np.abs(m[:, 1] - 128.0) / 128.0, 0.0)
+        return np.clip(norm @ cls.SCORE_WEIGHTS, 0.0, 1.0)
@@ -10,13 +10,17 @@ Flow:
   6. Return answer
 """
 
+import asyncio
 import time
 import json
 import logging
+import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Optional
 
-from src.infrastructure.db.repository import CaseRepository
+from src.infrastructure.db.repository import CaseRepository, HNSW_INDEX_SQL
 from src.infrastructure.embeddings.gemini_embeddings import GeminiEmbeddingService
+from src.infrastructure.rag.query_cache import QueryCache, query_key
 
 logger = logging.getLogger(__name__)
 
@@ -41,12 +45,41 @@ Respond in the same language the user writes (Portuguese or English).
 Be concise but thorough. Use bullet points and structured formatting.
 When referencing specific cases, mention their case_id."""
 
+    # Embedding batches in flight during backfill
+    EMBED_WORKERS = 4
+
+    # Prompt budget per case summary (chars); similar cases get the smaller
+    # one when the prompt carries more than CONTEXT_CASES_FULL cases
+    SUMMARY_MAX_CHARS = 800
+    SUMMARY_MAX_CHARS_CROWDED = 400
+    CONTEXT_CASES_FULL = 5
+
     def __init__(self, api_key: str, model: str = "gemini-2.0-flash"):
         self.api_key = api_key
         self.model = model
         self.repository = CaseRepository()
         self.embedding_service = GeminiEmbeddingService(api_key)
         self._client = None
+        # Question embeddings never go stale; search results do whenever a
+        # case is embedded, so only the search cache is invalidated.
+        self._embedding_cache = QueryCache(max_size=512, ttl_seconds=300)
+        self._search_cache = QueryCache(max_size=512, ttl_seconds=300)
+        # DB aggregates (COUNT/AVG over all cases) — a few seconds stale is fine
+        self._stats_cache = QueryCache(max_size=1, ttl_seconds=10)
+        self._check_vector_index()
+
+    def _check_vector_index(self):
+        """Warn when search_similar has no ANN index to rely on (O(N) scan per query)."""
+        try:
+            has_index = self.repository.has_hnsw_index()
+        except Exception as e:
+            logger.warning(f"Could not check vector index: {e}")
+            return
+        if has_index is False:
+            logger.warning(
+                "No HNSW index on case_embeddings — similarity search scans every "
+                f"embedding. Create one with:\n{HNSW_INDEX_SQL}"
+            )
 
     def _get_client(self):
         if self._client is None:
@@ -62,31 +95,106 @@ When referencing specific cases, mention their case_id."""
         """
         t0 = time.perf_counter()
 
-        # ── Step 1: Embed the user's question ──
-        query_vector = self.embedding_service.embed_text(message)
+        # ── Steps 1-2: Embed the question + search similar cases ──
+        similar_cases = self._find_similar(message)
+
+        # ── Step 3: Explicit context cases + DB stats ──
+        explicit_cases = self._fetch_explicit_cases(context_case_ids)
+        stats = self._get_stats()
+
+        # ── Step 4: Build context ──
+        user_prompt = self._build_prompt(message, similar_cases, explicit_cases, stats)
+
+        # ── Step 5: Call LLM ──
+        try:
+            client = self._get_client()
+            response = client.models.generate_content(**self._request(user_prompt))
+            return self._reply(t0, response.text, similar_cases)
+        except Exception as e:
+            return self._error(t0, e)
+
+    async def chat_async(self, message: str, context_case_ids: list[str] = None) -> dict:
+        """
+        Async variant of `chat()`.
+
+        The DB lookups (explicit cases, stats) don't depend on the question
+        embedding, so they run in threads while the embedding RPC is in flight.
+        """
+        t0 = time.perf_counter()
+
+        similar_cases, explicit_cases, stats = await asyncio.gather(
+            self._find_similar_async(message),
+            asyncio.to_thread(self._fetch_explicit_cases, context_case_ids),
+            asyncio.to_thread(self._get_stats),
+        )
+        user_prompt = await asyncio.to_thread(
+            self._build_prompt, message, similar_cases, explicit_cases, stats,
+        )
 
-        # ── Step 2: Search similar cases ──
-        similar_cases = []
-        if query_vector:
+        try:
+            client = self._get_client()
+            response = await client.aio.models.generate_content(**self._request(user_prompt))
+            return self._reply(t0, response.text, similar_cases)
+        except Exception as e:
+            return self._error(t0, e)
+
+    # ── Chat helpers ──
+
+    def _find_similar(self, message: str) -> list:
+        """Embed the question (cached) and search similar cases."""
+        key = query_key(message)
+        query_vector = self._embedding_cache.get(key)
+        if query_vector is None:
+            query_vector = self.embedding_service.embed_text(message)
+            if query_vector:
+                self._embedding_cache.set(key, query_vector)
+        return self._search_cached(key, query_vector)
+
+    async def _find_similar_async(self, message: str) -> list:
+        key = query_key(message)
+        query_vector = self._embedding_cache.get(key)
+        if query_vector is None:
+            query_vector = await self.embedding_service.embed_text_async(message)
+            if query_vector:
+                self._embedding_cache.set(key, query_vector)
+        return await asyncio.to_thread(self._search_cached, key, query_vector)
+
+    def _search_cached(self, key: str, query_vector: Optional[list[float]]) -> list:
+        """Similar cases for a question vector (cached until the next embed)."""
+        if not query_vector:
+            return []
+        similar_cases = self._search_cache.get(key)
+        if similar_cases is None:
             similar_cases = self.repository.search_similar(query_vector, top_k=5)
-            logger.info(f"RAG found {len(similar_cases)} similar cases")
+            self._search_cache.set(key, similar_cases)
+        logger.info(f"RAG found {len(similar_cases)} similar cases")
+        return similar_cases
 
-        # ── Step 3: Add explicit context cases ──
+    def _fetch_explicit_cases(self, context_case_ids: Optional[list[str]]) -> list:
         explicit_cases = []
-        if context_case_ids:
-            for cid in context_case_ids:
-                case = self.repository.get_by_id(cid)
-                if case:
-                    explicit_cases.append(case)
-
-        # ── Step 4: Build context ──
+        for cid in context_case_ids or []:
+            case = self.repository.get_by_id(cid)
+            if case:
+                explicit_cases.append(case)
+        return explicit_cases
+
+    def _get_stats(self) -> dict:
+        stats = self._stats_cache.get("stats")
+        if stats is None:
+            stats = self.repository.get_stats()
+            self._stats_cache.set("stats", stats)
+        return stats
+
+    def _build_prompt(self, message: str, similar_cases: list, explicit_cases: list, stats: dict) -> str:
         context_parts = []
 
         if similar_cases:
+            crowded = len(similar_cases) + len(explicit_cases) > self.CONTEXT_CASES_FULL
+            max_chars = self.SUMMARY_MAX_CHARS_CROWDED if crowded else self.SUMMARY_MAX_CHARS
             context_parts.append("=== SIMILAR CASES FROM VECTOR DATABASE (RAG) ===")
             for i, case in enumerate(similar_cases, 1):
                 sim_score = case.get("similarity_score", 0)
-                summary = self._case_summary(case)
+                summary = self._case_summary(case, max_chars=max_chars)
                 context_parts.append(f"\n--- Similar Case #{i} (similarity: {sim_score:.3f}) ---\n{summary}")
 
         if explicit_cases:
@@ -102,46 +210,49 @@ When referencing specific cases, mention their case_id."""
                 for case in recent["cases"]:
                     context_parts.append(self._case_summary(case))
 
-        # Stats
-        stats = self.repository.get_stats()
+        # Stats (last: they change with every new case)
         context_parts.append(f"\n=== DATABASE STATS ===\nTotal cases: {stats['total']}, "
                            f"Approved: {stats['approved']}, Rejected: {stats['rejected']}, "
                            f"Review: {stats['review']}, Avg Score: {stats['avg_score']}")
 
-        # ── Step 5: Call LLM ──
         context_text = "\n".join(context_parts) if context_parts else "No cases in database yet."
 
-        user_prompt = f"""CONTEXT FROM RAG VECTOR DATABASE:
+        return f"""CONTEXT FROM RAG VECTOR DATABASE:
 {context_text}
 
 USER QUESTION: {message}"""
 
-        try:
-            client = self._get_client()
-            response = client.models.generate_content(
-                model=self.model,
-                contents=[self.SYSTEM_PROMPT, user_prompt],
-            )
-            latency = (time.perf_counter() - t0) * 1000
-
-            return {
-                "reply": response.text,
-                "model": self.model,
-                "latency_ms": round(latency, 1),
-                "rag_cases_found": len(similar_cases),
-                "rag_case_ids": [c.get("case_id") for c in similar_cases],
-            }
+    def _request(self, user_prompt: str) -> dict:
+        """Keyword arguments shared by generate_content (sync and aio)."""
+        # Static system prompt goes in system_instruction (cacheable prefix);
+        # only the per-question context and question go in contents.
+        return {
+            "model": self.model,
+            "contents": [user_prompt],
+            "config": {"system_instruction": self.SYSTEM_PROMPT},
+        }
+
+    def _reply(self, t0: float, text: str, similar_cases: list) -> dict:
+        latency = (time.perf_counter() - t0) * 1000
+        return {
+            "reply": text,
+            "model": self.model,
+            "latency_ms": round(latency, 1),
+            "rag_cases_found": len(similar_cases),
+            "rag_case_ids": [c.get("case_id") for c in similar_cases],
+        }
 
-        except Exception as e:
-            latency = (time.perf_counter() - t0) * 1000
-            logger.error(f"RAG chat failed: {e}")
-            return {
-                "reply": f"Error: {e}",
-                "model": "error",
-                "latency_ms": round(latency, 1),
-                "rag_cases_found": 0,
-                "rag_case_ids": [],
-            }
+    @staticmethod
+    def _error(t0: float, e: Exception) -> dict:
+        latency = (time.perf_counter() - t0) * 1000
+        logger.error(f"RAG chat failed: {e}")
+        return {
+            "reply": f"Error: {e}",
+            "model": "error",
+            "latency_ms": round(latency, 1),
+            "rag_cases_found": 0,
+            "rag_case_ids": [],
+        }
 
     def embed_case(self, case_id: str) -> bool:
         """Generate and store embedding for a case."""
@@ -156,6 +267,8 @@ USER QUESTION: {message}"""
             return False
 
         self.repository.save_embedding(case_id, vector, model=self.embedding_service.MODEL)
+        self._search_cache.clear()
+        self._stats_cache.clear()
         logger.info(f"Embedded case {case_id} (dim={len(vector)})")
         return True
 
@@ -164,44 +277,92 @@ USER QUESTION: {message}"""
         from src.infrastructure.db.database import get_db
         from src.infrastructure.db.models import CaseRecord, CaseEmbedding
 
-        count = 0
         with get_db() as db:
-            # Find cases without embeddings
-            cases_with_emb = db.query(CaseEmbedding.case_id).subquery()
-            unembedded = db.query(CaseRecord.case_id).filter(
-                ~CaseRecord.case_id.in_(db.query(cases_with_emb.c.case_id))
-            ).all()
-
-        for (case_id,) in unembedded:
-            if self.embed_case(case_id):
-                count += 1
+            # Find cases without embeddings (anti-join), streamed 500 rows at a time
+            unembedded = (
+                db.query(CaseRecord)
+                .outerjoin(CaseEmbedding, CaseRecord.case_id == CaseEmbedding.case_id)
+                .filter(CaseEmbedding.case_id.is_(None))
+                .yield_per(500)
+            )
+            pending = [(case.case_id, case.to_summary_text()) for case in unembedded]
 
+        # One embedding request per batch, EMBED_WORKERS batches in flight.
+        # DB writes stay on this thread, one bulk save per finished batch.
+        count = 0
+        batch_size = self.embedding_service.MAX_BATCH
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+
+        def embed_batch(texts):
+            # Jitter on the worker thread: staggers the first requests
+            # without holding up submission of the remaining batches
+            time.sleep(random.uniform(0, 0.2))
+            return self.embedding_service.embed_texts(texts)
+
+        with ThreadPoolExecutor(max_workers=self.EMBED_WORKERS) as pool:
+            futures = {}
+            for batch in batches:
+                texts = [text for _, text in batch]
+                futures[pool.submit(embed_batch, texts)] = batch
+
+            for future in as_completed(futures):
+                batch = futures[future]
+                pairs = [(case_id, vec) for (case_id, _), vec in zip(batch, future.result()) if vec]
+                if len(pairs) < len(batch):
+                    logger.warning(f"Embedding generation failed for {len(batch) - len(pairs)} cases")
+                count += self.repository.save_embeddings_bulk(pairs, model=self.embedding_service.MODEL)
+
+        self._search_cache.clear()
+        self._stats_cache.clear()
         logger.info(f"Embedded {count} cases")
         return count
 
+    def get_cache_stats(self) -> dict:
+        """Hit/miss stats of the query caches."""
+        return {
+            "embedding": self._embedding_cache.stats(),
+            "search": self._search_cache.stats(),
+            "stats": self._stats_cache.stats(),
+        }
+
     @staticmethod
-    def _case_summary(case: dict) -> str:
-        """Create a compact text summary of a case for the LLM prompt."""
-        parts = [f"Case ID: {case.get('case_id', 'unknown')}"]
-        parts.append(f"Decision: {case.get('final_decision', '?')} (score: {case.get('final_score', 0):.2f})")
+    def _case_summary(case: dict, max_chars: int = SUMMARY_MAX_CHARS) -> str:
+        """
+        Create a compact text summary of a case for the LLM prompt.
+        ID and decision are always included; detail lines stop once the
+        summary reaches `max_chars`.
+        """
+        parts = [
+            f"Case ID: {case.get('case_id', 'unknown')}",
+            f"Decision: {case.get('final_decision', '?')} (score: {case.get('final_score', 0):.2f})",
+        ]
+        size = sum(map(len, parts)) + 1
+
+        def add(line: str) -> bool:
+            nonlocal size
+            if size >= max_chars:
+                return False
+            parts.append(line)
+            size += len(line) + 1
+            return True
 
         ocr = case.get("ocr") or {}
-        fields = ocr.get("fields", [])
-        if fields:
-            for f in fields[:8]:
-                if isinstance(f, dict):
-                    parts.append(f"  {f.get('name')}: {f.get('value')}")
+        fields = [f for f in ocr.get("fields", [])[:8] if isinstance(f, dict)]
+        for f in fields:
+            if not add(f"  {f.get('name')}: {f.get('value')}"):
+                break
 
         rules = case.get("rules") or {}
         if rules.get("violations"):
             for v in rules["violations"][:3]:
                 if isinstance(v, dict):
-                    parts.append(f"  ⚠ [{v.get('severity')}] {v.get('rule_name')}: {v.get('detail')}")
+                    if not add(f"  ⚠ [{v.get('severity')}] {v.get('rule_name')}: {v.get('detail')}"):
+                        break
         else:
-            parts.append(f"  Rules: {rules.get('rules_passed', 0)}/{rules.get('rules_total', 0)} passed")
+            add(f"  Rules: {rules.get('rules_passed', 0)}/{rules.get('rules_total', 0)} passed")
 
         llm = case.get("llm") or {}
         if llm.get("assessment"):
-            parts.append(f"  AI: {llm['assessment'][:200]}")
+            add(f"  AI: {llm['assessment'][:200]}")
 
         return "\n".join(parts)
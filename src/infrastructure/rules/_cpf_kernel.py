@@ -0,0 +1,38 @@
+"""
+Validação de CPF em lote — dígitos verificadores (mod 11) vetorizados com NumPy.
+
+Para ingestão em massa: N CPFs viram uma matriz (N, 11) e as duas somas
+ponderadas são dois produtos matriz-vetor, sem laço Python por CPF.
+"""
+
+from typing import Sequence
+
+import numpy as np
+
+_W1 = np.arange(10, 1, -1, dtype=np.int32)  # 9 primeiros dígitos
+_W2 = np.arange(11, 1, -1, dtype=np.int32)  # 10 primeiros dígitos
+
+
+def validate_cpf_batch(cpfs: Sequence[str]) -> np.ndarray:
+    """
+    Valida os dígitos verificadores de vários CPFs de uma vez.
+
+    Recebe CPFs só com dígitos (como após limpeza com \\D) e retorna um array
+    bool com o mesmo resultado de `_validate_cpf_digits` para cada um.
+    Entradas que não são exatamente 11 dígitos ASCII retornam False.
+    """
+    result = np.zeros(len(cpfs), dtype=bool)
+    rows = [i for i, c in enumerate(cpfs) if len(c) == 11 and c.isascii() and c.isdigit()]
+    if not rows:
+        return result
+
+    buf = "".join(cpfs[i] for i in rows).encode("ascii")
+    nums = np.frombuffer(buf, dtype=np.uint8).reshape(-1, 11).astype(np.int32) - ord("0")
+
+    d1 = 11 - (nums[:, :9] @ _W1) % 11
+    d1[d1 >= 10] = 0
+    d2 = 11 - (nums[:, :10] @ _W2) % 11
+    d2[d2 >= 10] = 0
+
+    result[rows] = (nums[:, 9] == d1) & (nums[:, 10] == d2)
+    return result
@@ -6,11 +6,28 @@ Cada regra é uma função pura — fácil de adicionar/remover/testar.
 """
 
 import re
+from bisect import bisect_right
 from datetime import datetime, date
+from functools import lru_cache
+from operator import mul
 
-from src.core.interfaces.rules_engine import IRulesEngine, RulesResult, RuleViolation
+import numpy as np
+
+from src.core.interfaces.rules_engine import IRulesEngine, RulesResult, RuleViolation, Severity
 from src.core.interfaces.ocr_engine import OCRResult
 
+# Pesos dos dígitos verificadores do CPF (mod 11)
+_CPF_W1 = tuple(range(10, 1, -1))  # 9 primeiros dígitos
+_CPF_W2 = tuple(range(11, 1, -1))  # 10 primeiros dígitos
+
+# Faixas de risco: score < 0.2 → LOW, < 0.5 → MEDIUM, < 0.8 → HIGH, senão CRITICAL
+_RISK_THRESHOLDS = (0.2, 0.5, 0.8)
+_RISK_LABELS = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+
+# Regex pré-compiladas
+_NON_DIGIT_RE = re.compile(r"\D")
+_NAME_VALID_RE = re.compile(r"^[A-ZÀ-Ü\s\.\-']+$")
+
 
 class BrazilianDocRulesEngine(IRulesEngine):
     """
@@ -29,37 +46,61 @@ class BrazilianDocRulesEngine(IRulesEngine):
 
     RULES_VERSION = "1.0.0"
 
-    def __init__(self, rules_version: str | None = None):
+    # Pesos por severidade (risk_score = soma, limitada a 1.0)
+    SEVERITY_WEIGHTS = {
+        Severity.LOW: 0.1,
+        Severity.MEDIUM: 0.25,
+        Severity.HIGH: 0.5,
+        Severity.CRITICAL: 1.0,
+    }
+
+    def __init__(self, rules_version: str | None = None, short_circuit: bool = True):
         self._rules_version = rules_version or self.RULES_VERSION
+        # Para de avaliar regras quando o risco já saturou em 1.0
+        self.short_circuit = short_circuit
 
     def apply(self, ocr_result: OCRResult, doc_type: str | None = None) -> RulesResult:
         """Aplica todas as regras sobre os campos do OCR."""
         violations: list[RuleViolation] = []
-        fields_map = {f.name: f.value for f in ocr_result.fields}
-        conf_map = {f.name: f.confidence for f in ocr_result.fields}
+        fields_map = ocr_result.field_values
 
-        # Lista de regras a aplicar (cada uma retorna violação ou None)
+        # Regras avaliadas em ordem, sob demanda (cada uma retorna violação ou None)
         rules = [
-            self._rule_cpf_checksum(fields_map),
-            self._rule_required_fields(fields_map),
-            self._rule_date_format(fields_map),
-            self._rule_date_plausibility(fields_map),
-            self._rule_name_valid(fields_map),
-            self._rule_age_plausible(fields_map),
-            self._rule_emission_after_birth(fields_map),
-            self._rule_ocr_confidence(ocr_result.avg_confidence, conf_map),
+            lambda: self._rule_cpf_checksum(fields_map),
+            lambda: self._rule_required_fields(fields_map),
+            lambda: self._rule_date_format(fields_map),
+            lambda: self._rule_date_plausibility(fields_map),
+            lambda: self._rule_name_valid(fields_map),
+            lambda: self._rule_age_plausible(fields_map),
+            lambda: self._rule_emission_after_birth(fields_map),
+            lambda: self._rule_ocr_confidence(ocr_result.avg_confidence, ocr_result.field_confidences),
         ]
 
-        for result in rules:
-            if result is not None:
-                if isinstance(result, list):
-                    violations.extend(result)
-                else:
-                    violations.append(result)
+        weights = self.SEVERITY_WEIGHTS
+
+        def emit(result) -> float:
+            """Anexa direto em violations; retorna o peso acrescentado."""
+            if result is None:
+                return 0.0
+            if isinstance(result, list):
+                violations.extend(result)
+                return sum(weights[v.severity] for v in result)
+            violations.append(result)
+            return weights[result.severity]
+
+        skipped = 0
+        running_weight = 0.0
+        for i, rule in enumerate(rules):
+            running_weight += emit(rule())
+
+            # Risco saturado: as regras restantes não mudam score nem nível
+            if self.short_circuit and running_weight >= 1.0:
+                skipped = len(rules) - i - 1
+                break
 
         total = 8  # total de regras
         failed = len(violations)
-        passed = total - failed
+        passed = total - failed - skipped
 
         risk_score = self._compute_risk_score(violations)
         risk_level = self._risk_level(risk_score)
@@ -72,6 +113,7 @@ class BrazilianDocRulesEngine(IRulesEngine):
             risk_score=round(risk_score, 3),
             risk_level=risk_level,
             rules_version=self._rules_version,
+            rules_skipped=skipped,
         )
 
     # ─── REGRAS ─────────────────────────────────────────────
@@ -82,7 +124,7 @@ class BrazilianDocRulesEngine(IRulesEngine):
         if not cpf_raw:
             return None  # Sem CPF → regra não se aplica aqui
 
-        digits = re.sub(r"\D", "", cpf_raw)
+        digits = _NON_DIGIT_RE.sub("", cpf_raw)
         if len(digits) != 11:
             return RuleViolation(
                 rule_id="CPF_LENGTH",
@@ -184,7 +226,7 @@ class BrazilianDocRulesEngine(IRulesEngine):
             return None
 
         # Nome deve ter pelo menos 2 palavras e só letras/espaços/acentos
-        if not re.match(r"^[A-ZÀ-Ü\s\.\-']+$", nome.upper()):
+        if not _NAME_VALID_RE.match(nome.upper()):
             return RuleViolation(
                 rule_id="INVALID_NAME_CHARS",
                 rule_name="Nome com caracteres inválidos",
@@ -213,7 +255,9 @@ class BrazilianDocRulesEngine(IRulesEngine):
         if parsed is None:
             return None
 
-        age = (date.today() - parsed).days // 365
+        # Idade em anos completos (correta em anos bissextos e aniversários)
+        today = date.today()
+        age = today.year - parsed.year - ((today.month, today.day) < (parsed.month, parsed.day))
         if age < 0 or age > 130:
             return RuleViolation(
                 rule_id="IMPLAUSIBLE_AGE",
@@ -262,57 +306,58 @@ class BrazilianDocRulesEngine(IRulesEngine):
     @staticmethod
     def _validate_cpf_digits(digits: str) -> bool:
         """Valida últimos 2 dígitos do CPF (algoritmo mod-11)."""
-        nums = [int(d) for d in digits]
+        nums = list(map(int, digits))
 
-        # Primeiro dígito verificador
-        weights_1 = list(range(10, 1, -1))
-        sum_1 = sum(n * w for n, w in zip(nums[:9], weights_1))
-        d1 = 11 - (sum_1 % 11)
+        # Primeiro dígito verificador (map para no fim dos pesos: 9 dígitos)
+        d1 = 11 - (sum(map(mul, nums, _CPF_W1)) % 11)
         d1 = 0 if d1 >= 10 else d1
 
-        # Segundo dígito verificador
-        weights_2 = list(range(11, 1, -1))
-        sum_2 = sum(n * w for n, w in zip(nums[:10], weights_2))
-        d2 = 11 - (sum_2 % 11)
+        # Segundo dígito verificador (10 dígitos)
+        d2 = 11 - (sum(map(mul, nums, _CPF_W2)) % 11)
         d2 = 0 if d2 >= 10 else d2
 
         return nums[9] == d1 and nums[10] == d2
 
     @staticmethod
+    @lru_cache(maxsize=256)
     def _parse_date(date_str: str) -> date | None:
         """Tenta parsear data em formatos brasileiros comuns."""
+        s = date_str.strip()
+
+        # Fast path: DD?MM?YYYY com separador único — fatia direto, sem strptime
+        if len(s) == 10 and s[2] in "/-." and s[5] == s[2]:
+            day, month, year = s[0:2], s[3:5], s[6:10]
+            if (day + month + year).isascii() and (day + month + year).isdigit():
+                try:
+                    return date(int(year), int(month), int(day))
+                except ValueError:
+                    return None
+
+        # Fallback: dia/mês sem zero à esquerda etc.
         for fmt in ("%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y"):
             try:
-                return datetime.strptime(date_str.strip(), fmt).date()
+                return datetime.strptime(s, fmt).date()
             except ValueError:
                 continue
         return None
 
-    @staticmethod
-    def _compute_risk_score(violations: list[RuleViolation]) -> float:
+    @classmethod
+    def _compute_risk_score(cls, violations: list[RuleViolation]) -> float:
         """Calcula score de risco baseado nas violações."""
         if not violations:
             return 0.0
 
-        severity_weights = {
-            "LOW": 0.1,
-            "MEDIUM": 0.25,
-            "HIGH": 0.5,
-            "CRITICAL": 1.0,
-        }
-
         total_weight = sum(
-            severity_weights.get(v.severity, 0.25) for v in violations
+            cls.SEVERITY_WEIGHTS[v.severity] for v in violations
         )
         return min(total_weight, 1.0)
 
     @staticmethod
     def _risk_level(score: float) -> str:
         """Converte score numérico em nível textual."""
-        if score < 0.2:
-            return "LOW"
-        elif score < 0.5:
-            return "MEDIUM"
-        elif score < 0.8:
-            return "HIGH"
-        return "CRITICAL"
+        return _RISK_LABELS[bisect_right(_RISK_THRESHOLDS, score)]
+
+    @staticmethod
+    def _risk_level_batch(scores: np.ndarray) -> np.ndarray:
+        """`_risk_level` para um array de scores (classificação em lote)."""
+        return np.asarray(_RISK_LABELS)[np.searchsorted(_RISK_THRESHOLDS, scores, side="right")]
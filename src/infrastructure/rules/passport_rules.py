@@ -13,8 +13,10 @@ from dataclasses import dataclass
 from datetime import date
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
+
 from src.core.interfaces.ocr_engine import OCRResult
-from src.core.interfaces.rules_engine import IRulesEngine, RulesResult, RuleViolation
+from src.core.interfaces.rules_engine import IRulesEngine, RulesResult, RuleViolation, Severity
 
 
 # ── ICAO 9303 MRZ Character Weights ─────────────────────────────────
@@ -27,8 +29,32 @@ MRZ_CHAR_VALUES["<"] = 0
 
 MRZ_WEIGHTS = [7, 3, 1]
 
+_DATE_NUM_RE = re.compile(r"\d+")
+
+# Risk score in integer points (2× the 3/2/1/0.5 weights, scale 30 instead of
+# 15): level thresholds 0.7/0.4/0.2 become exact integer compares 21/12/6.
+_SEVERITY_POINTS = {Severity.CRITICAL: 6, Severity.HIGH: 4, Severity.MEDIUM: 2, Severity.LOW: 1}
+_RISK_SCALE_POINTS = 30
+
+# Byte → MRZ value lookup (lowercase folded in, unknown chars → 0)
+_MRZ_BYTE_VALUES = [0] * 256
+for _c, _v in MRZ_CHAR_VALUES.items():
+    _MRZ_BYTE_VALUES[ord(_c)] = _v
+    _MRZ_BYTE_VALUES[ord(_c.lower())] = _v
+
+# The only non-latin-1 code points whose upper() is an MRZ char ('ı'→'I',
+# 'ſ'→'S'); folded before encoding so they score like str.upper() lookup.
+_MRZ_NON_LATIN1_FOLD = str.maketrans({"\u0131": "I", "\u017f": "S"})
+
+
+def _mrz_bytes(data: str) -> bytes:
+    """latin-1 bytes for the value table; same per-char values as MRZ_CHAR_VALUES[c.upper()]."""
+    if not data.isascii():
+        data = data.translate(_MRZ_NON_LATIN1_FOLD)
+    return data.encode("latin-1", "replace")
+
 # Valid ISO 3166-1 alpha-3 country codes (subset)
-VALID_COUNTRY_CODES = {
+VALID_COUNTRY_CODES = frozenset({
     "AFG", "ALB", "DZA", "AND", "AGO", "ARG", "ARM", "AUS", "AUT",
     "AZE", "BHS", "BHR", "BGD", "BRB", "BLR", "BEL", "BLZ", "BEN",
     "BTN", "BOL", "BIH", "BWA", "BRA", "BRN", "BGR", "BFA", "BDI",
@@ -48,34 +74,108 @@ VALID_COUNTRY_CODES = {
     "TJK", "TZA", "THA", "TGO", "TTO", "TUN", "TUR", "TKM", "UGA",
     "UKR", "ARE", "GBR", "USA", "URY", "UZB", "VEN", "VNM", "YEM",
     "ZMB", "ZWE", "UTO",  # UTO = ICAO test nationality
-}
+})
 
 
 def mrz_check_digit(data: str) -> int:
-    """Calculate ICAO 9303 check digit (mod-10 weighted sum)."""
-    total = 0
-    for i, char in enumerate(data):
-        value = MRZ_CHAR_VALUES.get(char.upper(), 0)
-        weight = MRZ_WEIGHTS[i % 3]
-        total += value * weight
+    """Calculate ICAO 9303 check digit (mod-10 weighted sum).
+
+    Weights repeat 7-3-1, so each weight class is summed over a strided
+    byte slice instead of weighting character by character.
+    """
+    raw = _mrz_bytes(data)
+    value = _MRZ_BYTE_VALUES.__getitem__
+    total = (
+        MRZ_WEIGHTS[0] * sum(map(value, raw[0::3]))
+        + MRZ_WEIGHTS[1] * sum(map(value, raw[1::3]))
+        + MRZ_WEIGHTS[2] * sum(map(value, raw[2::3]))
+    )
     return total % 10
 
 
+# TD3 line-2 positions covered by each check digit, in the order
+# doc number, DOB, DOE, personal number, composite
+_TD3_CHECK_SPANS = (
+    np.r_[0:9],
+    np.r_[13:19],
+    np.r_[21:27],
+    np.r_[28:42],
+    np.r_[0:10, 13:20, 21:43],
+)
+_TD3_CHECK_WEIGHTS = tuple(
+    np.resize(np.array(MRZ_WEIGHTS, dtype=np.int32), len(span)) for span in _TD3_CHECK_SPANS
+)
+_MRZ_VALUE_LUT = np.array(_MRZ_BYTE_VALUES, dtype=np.int32)
+
+
+def td3_check_digits_batch(lines2: List[str]) -> np.ndarray:
+    """Expected check digits for many TD3 line-2 strings at once.
+
+    Returns an (N, 5) int array — doc number, DOB, DOE, personal number and
+    composite — equal to mrz_check_digit over the same slices. Lines are
+    padded with '<' (value 0) / truncated to 44 chars; digits for spans past
+    the end of a short line are meaningless and must not be used.
+    """
+    buf = b"".join(_mrz_bytes(l)[:44].ljust(44, b"<") for l in lines2)
+    values = _MRZ_VALUE_LUT[np.frombuffer(buf, dtype=np.uint8).reshape(-1, 44)]
+    return np.stack(
+        [values[:, span] @ w % 10 for span, w in zip(_TD3_CHECK_SPANS, _TD3_CHECK_WEIGHTS)],
+        axis=1,
+    )
+
+
+_DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
 def parse_mrz_date(date_str: str) -> Optional[date]:
     """Parse MRZ date YYMMDD → Python date. 00-29→2000s, 30-99→1900s."""
-    if len(date_str) != 6 or not date_str.isdigit():
+    # Range checks instead of catching date()'s ValueError: garbled OCR dates are common
+    if len(date_str) != 6 or not date_str.isdecimal():  # isdecimal: exactly what int() accepts
+        return None
+    yy, mm, dd = int(date_str[:2]), int(date_str[2:4]), int(date_str[4:6])
+    year = 2000 + yy if yy < 30 else 1900 + yy
+    if not 1 <= mm <= 12:
         return None
+    leap_day = mm == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+    if not 1 <= dd <= _DAYS_IN_MONTH[mm] + leap_day:
+        return None
+    return date(year, mm, dd)
+
+
+_VIZ_DATE_SEPS = "./- "
+
+
+def parse_viz_date(date_str: str) -> Optional[date]:
+    """Parse VIZ date (DD.MM.YYYY, DD/MM/YY, DD MM YYYY, ...) → date, or None."""
+    s = date_str
+    # Fast path: fixed-width DD?MM?YYYY — slices instead of the regex.
+    # Anything int()/date() reject — or that int() reads differently from \d+
+    # ('_' separators, a '-' sign) — takes the regex path.
+    if len(s) == 10 and s[2] in _VIZ_DATE_SEPS and s[5] in _VIZ_DATE_SEPS and "_" not in s:
+        try:
+            d, m, y = int(s[0:2]), int(s[3:5]), int(s[6:10])
+            if y >= 0:
+                if y < 100:
+                    y = 2000 + y if y < 30 else 1900 + y
+                return date(y, m, d)
+        except ValueError:
+            pass
+
+    nums = _DATE_NUM_RE.findall(s)
+    if len(nums) < 3:
+        return None
+    d, m, y = int(nums[0]), int(nums[1]), int(nums[2])
+    if y < 100:
+        y = 2000 + y if y < 30 else 1900 + y
     try:
-        yy, mm, dd = int(date_str[:2]), int(date_str[2:4]), int(date_str[4:6])
-        year = 2000 + yy if yy < 30 else 1900 + yy
-        return date(year, mm, dd)
+        return date(y, m, d)
     except ValueError:
-        return None
+        return None  # Can't parse VIZ date
 
 
-@dataclass
+@dataclass(slots=True)
 class MRZParsed:
-    """Parsed TD3 MRZ (2 lines × 44 chars)."""
+    """Parsed TD3 MRZ (2 lines × 44 chars). slots: no per-instance __dict__."""
     document_code: str = ""
     issuing_country: str = ""
     primary_identifier: str = ""
@@ -93,14 +193,20 @@ class MRZParsed:
     composite_check: int = -1
     raw_line1: str = ""
     raw_line2: str = ""
+    l1_norm: str = ""   # raw line stripped + uppercased (computed once for all rules)
+    l2_norm: str = ""
     is_valid_format: bool = False
+    # Check digits precomputed by apply_batch (same order as td3_check_digits_batch)
+    expected_checks: Optional[Tuple[int, ...]] = None
 
 
 def parse_mrz_td3(line1: str, line2: str) -> MRZParsed:
     """Parse TD3 passport MRZ."""
-    result = MRZParsed(raw_line1=line1, raw_line2=line2)
-    l1 = line1.strip().upper().replace(" ", "")
-    l2 = line2.strip().upper().replace(" ", "")
+    l1_norm = line1.strip().upper()
+    l2_norm = line2.strip().upper()
+    result = MRZParsed(raw_line1=line1, raw_line2=line2, l1_norm=l1_norm, l2_norm=l2_norm)
+    l1 = l1_norm.replace(" ", "")
+    l2 = l2_norm.replace(" ", "")
 
     if len(l1) < 40 or len(l2) < 40:
         return result
@@ -150,23 +256,64 @@ class PassportRulesEngine(IRulesEngine):
     RULES_VERSION = "passport-v1.0"
 
     def __init__(self):
+        # (rule_id, rule_name, fn, needs_mrz) — needs_mrz rules only run on a
+        # well-formed parsed MRZ (checked once per document in _evaluate)
         self._rules = [
-            ("MRZ_FORMAT", "MRZ Format Validation", self._rule_mrz_format),
-            ("DOC_NUM_CHECK", "Document Number Checksum", self._rule_doc_number_check),
-            ("DOB_CHECK", "Date of Birth Checksum", self._rule_dob_check),
-            ("DOE_CHECK", "Date of Expiry Checksum", self._rule_doe_check),
-            ("PN_CHECK", "Personal Number Checksum", self._rule_personal_number_check),
-            ("COMPOSITE_CHECK", "Composite Checksum", self._rule_composite_check),
-            ("COUNTRY_CODE", "Country Code Validation", self._rule_country_code),
-            ("DATE_PLAUSIBILITY", "Date Plausibility", self._rule_date_plausibility),
-            ("REQUIRED_FIELDS", "Required Fields Presence", self._rule_required_fields),
-            ("CROSS_CHECK", "VIZ ↔ MRZ Cross-Check", self._rule_cross_check),
+            ("MRZ_FORMAT", "MRZ Format Validation", self._rule_mrz_format, False),
+            ("DOC_NUM_CHECK", "Document Number Checksum", self._rule_doc_number_check, True),
+            ("DOB_CHECK", "Date of Birth Checksum", self._rule_dob_check, True),
+            ("DOE_CHECK", "Date of Expiry Checksum", self._rule_doe_check, True),
+            ("PN_CHECK", "Personal Number Checksum", self._rule_personal_number_check, True),
+            ("COMPOSITE_CHECK", "Composite Checksum", self._rule_composite_check, True),
+            ("COUNTRY_CODE", "Country Code Validation", self._rule_country_code, True),
+            ("DATE_PLAUSIBILITY", "Date Plausibility", self._rule_date_plausibility, True),
+            ("REQUIRED_FIELDS", "Required Fields Presence", self._rule_required_fields, False),
+            ("CROSS_CHECK", "VIZ ↔ MRZ Cross-Check", self._rule_cross_check, True),
         ]
 
     def apply(self, ocr_result: OCRResult, doc_type: str | None = None) -> RulesResult:
         """Apply all passport rules to OCR result."""
+        fields, mrz = self._parse(ocr_result)
+        return self._evaluate(fields, mrz, date.today())
+
+    def apply_raw(self, ocr_result: OCRResult, doc_type: str | None = None) -> dict:
+        """
+        Same as apply(), as a plain dict with RulesResult's keys.
+
+        Violations stay (rule_id, rule_name, severity, detail) tuples — no
+        RuleViolation objects — for callers that only serialize the result.
+        """
+        fields, mrz = self._parse(ocr_result)
+        return self._evaluate_raw(fields, mrz, date.today())
+
+    def apply_batch(
+        self,
+        ocr_results: List[OCRResult],
+        today: Optional[date] = None,
+    ) -> List[RulesResult]:
+        """
+        Apply all rules to many documents.
+
+        The five MRZ check digits of every document are computed in one
+        vectorized pass (td3_check_digits_batch); the other rules run per document.
+        `today` (default: date.today(), read once) is the reference date for all.
+        """
+        today = today or date.today()
+        parsed = [self._parse(r) for r in ocr_results]
+        mrzs = [mrz for _, mrz in parsed if mrz is not None and mrz.is_valid_format]
+        if mrzs:
+            expected = td3_check_digits_batch([mrz.l2_norm for mrz in mrzs])
+            for mrz, row in zip(mrzs, expected.tolist()):
+                mrz.expected_checks = tuple(row)
+        return [self._evaluate(fields, mrz, today) for fields, mrz in parsed]
+
+    @staticmethod
+    def _parse(ocr_result) -> Tuple[Dict, Optional[MRZParsed]]:
+        """Field dict + parsed MRZ (None without both MRZ lines)."""
         # Convert OCRResult fields to dict
-        if hasattr(ocr_result, 'fields') and isinstance(ocr_result.fields, list):
+        if isinstance(ocr_result, OCRResult):
+            fields = ocr_result.field_values
+        elif hasattr(ocr_result, 'fields') and isinstance(ocr_result.fields, list):
             # OCRResult.fields is a list of OCRField objects
             fields = {}
             for f in ocr_result.fields:
@@ -186,60 +333,72 @@ class PassportRulesEngine(IRulesEngine):
         l2 = fields.get("mrz_lower_line", "")
         if l1 and l2:
             mrz = parse_mrz_td3(l1, l2)
+        return fields, mrz
+
+    def _evaluate(self, fields: Dict, mrz: Optional[MRZParsed], today: date) -> RulesResult:
+        raw = self._evaluate_raw(fields, mrz, today)
+        raw["violations"] = [RuleViolation(*v) for v in raw["violations"]]
+        return RulesResult(**raw)
 
-        violations = []
+    def _evaluate_raw(self, fields: Dict, mrz: Optional[MRZParsed], today: date) -> dict:
+        violations = []  # (rule_id, rule_name, severity, detail)
         rules_failed_set = set()
+        points = 0
+        mrz_ok = mrz is not None and mrz.is_valid_format
 
-        for rule_id, rule_name, rule_fn in self._rules:
+        for rule_id, rule_name, rule_fn, needs_mrz in self._rules:
+            if needs_mrz and not mrz_ok:
+                continue  # passes vacuously, as before
             try:
-                rule_violations = rule_fn(fields, mrz)
+                rule_violations = rule_fn(fields, mrz, today)
                 for sev, detail in rule_violations:
-                    violations.append(RuleViolation(
-                        rule_id=rule_id,
-                        rule_name=rule_name,
-                        severity=sev,
-                        detail=detail,
-                    ))
+                    # Lookup also rejects an unknown severity, like RuleViolation would
+                    points += _SEVERITY_POINTS[sev]
+                    violations.append((rule_id, rule_name, sev, detail))
                     rules_failed_set.add(rule_id)
             except Exception as e:
-                violations.append(RuleViolation(
-                    rule_id=rule_id,
-                    rule_name=rule_name,
-                    severity="LOW",
-                    detail=f"Rule execution error: {e}",
-                ))
+                points += _SEVERITY_POINTS[Severity.LOW]
+                violations.append((rule_id, rule_name, "LOW", f"Rule execution error: {e}"))
 
         rules_total = len(self._rules)
         rules_failed = len(rules_failed_set)
         rules_passed = rules_total - rules_failed
 
-        # Risk score: weight by severity
-        sev_weights = {"CRITICAL": 3, "HIGH": 2, "MEDIUM": 1, "LOW": 0.5}
-        total_weight = sum(sev_weights.get(v.severity, 0) for v in violations)
-        risk_score = min(1.0, total_weight / 15.0)
+        # Risk score: weight by severity (integer points, see _SEVERITY_POINTS)
+        risk_score = min(1.0, points / _RISK_SCALE_POINTS)
 
-        if risk_score >= 0.7:
+        if points >= 21:
             risk_level = "CRITICAL"
-        elif risk_score >= 0.4:
+        elif points >= 12:
             risk_level = "HIGH"
-        elif risk_score >= 0.2:
+        elif points >= 6:
             risk_level = "MEDIUM"
         else:
             risk_level = "LOW"
 
-        return RulesResult(
-            rules_passed=rules_passed,
-            rules_failed=rules_failed,
-            rules_total=rules_total,
-            violations=violations,
-            risk_score=round(risk_score, 3),
-            risk_level=risk_level,
-            rules_version=self.RULES_VERSION,
-        )
+        return {
+            "rules_passed": rules_passed,
+            "rules_failed": rules_failed,
+            "rules_total": rules_total,
+            "violations": violations,
+            "risk_score": round(risk_score, 3),
+            "risk_level": risk_level,
+            "rules_version": self.RULES_VERSION,
+            "rules_skipped": 0,  # every rule is evaluated (no short-circuit here)
+        }
 
     # ── Rules (each returns list of (severity, detail) tuples) ───────
+    # Signature: (fields, mrz, today) — `today` is read once per apply/apply_batch.
+    # Rules flagged needs_mrz in _rules may assume a well-formed `mrz`.
 
-    def _rule_mrz_format(self, fields: Dict, mrz: Optional[MRZParsed]) -> List[Tuple[str, str]]:
+    @staticmethod
+    def _expected_check(mrz: MRZParsed, index: int, data: str) -> int:
+        """Check digit for `data`, taken from apply_batch's precomputed row if present."""
+        if mrz.expected_checks is not None:
+            return mrz.expected_checks[index]
+        return mrz_check_digit(data)
+
+    def _rule_mrz_format(self, fields: Dict, mrz: Optional[MRZParsed], today: date) -> List[Tuple[str, str]]:
         v = []
         l1 = fields.get("mrz_upper_line", "")
         l2 = fields.get("mrz_lower_line", "")
@@ -255,68 +414,58 @@ class PassportRulesEngine(IRulesEngine):
             v.append(("MEDIUM", f"MRZ line 1 should start with 'P', got '{l1[:2]}'"))
         return v
 
-    def _rule_doc_number_check(self, fields: Dict, mrz: Optional[MRZParsed]) -> List[Tuple[str, str]]:
-        if not mrz or not mrz.is_valid_format:
-            return []
-        l2 = mrz.raw_line2.strip().upper()
+    def _rule_doc_number_check(self, fields: Dict, mrz: Optional[MRZParsed], today: date) -> List[Tuple[str, str]]:
+        l2 = mrz.l2_norm
         if len(l2) < 10:
             return []
-        expected = mrz_check_digit(l2[0:9])
+        expected = self._expected_check(mrz, 0, l2[0:9])
         if mrz.document_number_check != expected:
             return [("CRITICAL", f"Doc number check: got {mrz.document_number_check}, expected {expected}")]
         return []
 
-    def _rule_dob_check(self, fields: Dict, mrz: Optional[MRZParsed]) -> List[Tuple[str, str]]:
-        if not mrz or not mrz.is_valid_format:
-            return []
-        l2 = mrz.raw_line2.strip().upper()
+    def _rule_dob_check(self, fields: Dict, mrz: Optional[MRZParsed], today: date) -> List[Tuple[str, str]]:
+        l2 = mrz.l2_norm
         if len(l2) < 20:
             return []
-        expected = mrz_check_digit(l2[13:19])
+        expected = self._expected_check(mrz, 1, l2[13:19])
         if mrz.dob_check != expected:
             return [("CRITICAL", f"DOB check: got {mrz.dob_check}, expected {expected}")]
         return []
 
-    def _rule_doe_check(self, fields: Dict, mrz: Optional[MRZParsed]) -> List[Tuple[str, str]]:
-        if not mrz or not mrz.is_valid_format:
-            return []
-        l2 = mrz.raw_line2.strip().upper()
+    def _rule_doe_check(self, fields: Dict, mrz: Optional[MRZParsed], today: date) -> List[Tuple[str, str]]:
+        l2 = mrz.l2_norm
         if len(l2) < 28:
             return []
-        expected = mrz_check_digit(l2[21:27])
+        expected = self._expected_check(mrz, 2, l2[21:27])
         if mrz.doe_check != expected:
             return [("CRITICAL", f"DOE check: got {mrz.doe_check}, expected {expected}")]
         return []
 
-    def _rule_personal_number_check(self, fields: Dict, mrz: Optional[MRZParsed]) -> List[Tuple[str, str]]:
-        if not mrz or not mrz.is_valid_format:
-            return []
-        l2 = mrz.raw_line2.strip().upper()
+    def _rule_personal_number_check(self, fields: Dict, mrz: Optional[MRZParsed], today: date) -> List[Tuple[str, str]]:
+        l2 = mrz.l2_norm
         if len(l2) < 43:
             return []
         pn = l2[28:42]
         if pn.replace("<", "") == "":
             return []
-        expected = mrz_check_digit(pn)
+        expected = self._expected_check(mrz, 3, pn)
         if mrz.personal_number_check != expected:
             return [("HIGH", f"Personal number check: got {mrz.personal_number_check}, expected {expected}")]
         return []
 
-    def _rule_composite_check(self, fields: Dict, mrz: Optional[MRZParsed]) -> List[Tuple[str, str]]:
-        if not mrz or not mrz.is_valid_format:
-            return []
-        l2 = mrz.raw_line2.strip().upper()
+    def _rule_composite_check(self, fields: Dict, mrz: Optional[MRZParsed], today: date) -> List[Tuple[str, str]]:
+        l2 = mrz.l2_norm
         if len(l2) < 44:
             return []
-        composite_data = l2[0:10] + l2[13:20] + l2[21:43]
-        expected = mrz_check_digit(composite_data)
+        if mrz.expected_checks is not None:
+            expected = mrz.expected_checks[4]  # _TD3_CHECK_SPANS index mask, no concatenation
+        else:
+            expected = mrz_check_digit(l2[0:10] + l2[13:20] + l2[21:43])
         if mrz.composite_check != expected:
             return [("CRITICAL", f"Composite check: got {mrz.composite_check}, expected {expected}")]
         return []
 
-    def _rule_country_code(self, fields: Dict, mrz: Optional[MRZParsed]) -> List[Tuple[str, str]]:
-        if not mrz or not mrz.is_valid_format:
-            return []
+    def _rule_country_code(self, fields: Dict, mrz: Optional[MRZParsed], today: date) -> List[Tuple[str, str]]:
         v = []
         issuing = mrz.issuing_country.replace("<", "")
         if issuing and issuing not in VALID_COUNTRY_CODES:
@@ -326,11 +475,8 @@ class PassportRulesEngine(IRulesEngine):
             v.append(("HIGH", f"Invalid nationality: '{nat}'"))
         return v
 
-    def _rule_date_plausibility(self, fields: Dict, mrz: Optional[MRZParsed]) -> List[Tuple[str, str]]:
-        if not mrz or not mrz.is_valid_format:
-            return []
+    def _rule_date_plausibility(self, fields: Dict, mrz: Optional[MRZParsed], today: date) -> List[Tuple[str, str]]:
         v = []
-        today = date.today()
 
         dob = parse_mrz_date(mrz.date_of_birth)
         if dob:
@@ -351,7 +497,7 @@ class PassportRulesEngine(IRulesEngine):
             v.append(("CRITICAL", "DOB after DOE"))
         return v
 
-    def _rule_required_fields(self, fields: Dict, mrz: Optional[MRZParsed]) -> List[Tuple[str, str]]:
+    def _rule_required_fields(self, fields: Dict, mrz: Optional[MRZParsed], today: date) -> List[Tuple[str, str]]:
         v = []
         for f in ["mrz_upper_line", "mrz_lower_line", "primary_identifier",
                    "date_of_birth", "document_number"]:
@@ -360,18 +506,17 @@ class PassportRulesEngine(IRulesEngine):
                 v.append(("HIGH", f"Required field missing: {f}"))
         return v
 
-    def _rule_cross_check(self, fields: Dict, mrz: Optional[MRZParsed]) -> List[Tuple[str, str]]:
-        if not mrz or not mrz.is_valid_format:
-            return []
+    def _rule_cross_check(self, fields: Dict, mrz: Optional[MRZParsed], today: date) -> List[Tuple[str, str]]:
         v = []
+        # MRZ side is already uppercased and '<'-stripped by parse_mrz_td3
         viz_doc = fields.get("document_number", "").strip().replace(" ", "").upper()
-        mrz_doc = mrz.document_number.replace("<", "").upper()
+        mrz_doc = mrz.document_number
         if viz_doc and viz_doc not in ("[BBOX_PRESENT]", "") and mrz_doc:
             if viz_doc != mrz_doc:
                 v.append(("CRITICAL", f"Doc# mismatch: VIZ='{viz_doc}' vs MRZ='{mrz_doc}'"))
 
         viz_name = fields.get("primary_identifier", "").strip().upper()
-        mrz_name = mrz.primary_identifier.upper()
+        mrz_name = mrz.primary_identifier
         if viz_name and viz_name not in ("[BBOX_PRESENT]", "") and mrz_name:
             if viz_name[:3] != mrz_name[:3]:
                 v.append(("HIGH", f"Surname mismatch: VIZ='{viz_name}' vs MRZ='{mrz_name}'"))
@@ -386,17 +531,7 @@ class PassportRulesEngine(IRulesEngine):
         if viz_dob and viz_dob not in ("[BBOX_PRESENT]", "") and mrz.date_of_birth:
             mrz_dob = parse_mrz_date(mrz.date_of_birth)
             if mrz_dob:
-                # Extract day/month/year from VIZ (various formats)
-                dob_nums = re.findall(r'\d+', viz_dob)
-                if len(dob_nums) >= 3:
-                    try:
-                        # Try DD.MM.YYYY or DD MM YYYY
-                        d, m, y = int(dob_nums[0]), int(dob_nums[1]), int(dob_nums[2])
-                        if y < 100:
-                            y = 2000 + y if y < 30 else 1900 + y
-                        viz_date = date(y, m, d)
-                        if viz_date != mrz_dob:
-                            v.append(("CRITICAL", f"DOB mismatch: VIZ='{viz_dob}' vs MRZ={mrz_dob}"))
-                    except (ValueError, TypeError):
-                        pass  # Can't parse VIZ date, skip
+                viz_date = parse_viz_date(viz_dob)
+                if viz_date is not None and viz_date != mrz_dob:
+                    v.append(("CRITICAL", f"DOB mismatch: VIZ='{viz_dob}' vs MRZ={mrz_dob}"))
         return v
@@ -5,8 +5,33 @@ Implementação concreta do contrato IStorageService
 usando MinIO (compatível com API S3).
 """
 
+import hashlib
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import List, Tuple
+
 from src.core.interfaces.storage_service import IStorageService, StorageRef
 
+logger = logging.getLogger(__name__)
+
+# ── HTTP pool ──
+# Um único cliente por serviço: conexões keep-alive reaproveitadas entre
+# uploads/downloads (sem novo handshake TCP/TLS por chamada).
+POOL_NUM_POOLS = 4
+POOL_MAXSIZE = 32
+HTTP_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.2
+
+# Payloads até este tamanho vão num único PUT (passaportes: ~200KB–2MB);
+# acima, multipart com partes deste tamanho (mínimo S3 = 5 MiB).
+MULTIPART_PART_SIZE = 5 * 1024 * 1024
+
+# Uploads em lote: I/O de rede solta o GIL, então threads sobrepõem as
+# requisições (limitado pela banda, não pela latência). <= POOL_MAXSIZE.
+UPLOAD_WORKERS = 16
+
 
 class MinIOStorageService(IStorageService):
     """
@@ -16,20 +41,91 @@ class MinIOStorageService(IStorageService):
     outro código — só muda as credenciais de conexão.
     """
 
-    def __init__(self, endpoint: str, access_key: str, secret_key: str, bucket: str):
+    def __init__(
+        self,
+        endpoint: str,
+        access_key: str,
+        secret_key: str,
+        bucket: str,
+        secure: bool = False,
+    ):
         self._endpoint = endpoint
         self._access_key = access_key
         self._secret_key = secret_key
         self._bucket = bucket
+        self._secure = secure
+        self._client = self._build_client()
+        self._pool = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS, thread_name_prefix="minio-upload")
+
+    def _build_client(self):
+        # Lazy import: minio só é necessário quando o storage está habilitado
+        import urllib3
+        from minio import Minio
+
+        http_client = urllib3.PoolManager(
+            num_pools=POOL_NUM_POOLS,
+            maxsize=POOL_MAXSIZE,
+            block=False,
+            cert_reqs="CERT_REQUIRED",
+            retries=urllib3.Retry(
+                total=HTTP_RETRIES,
+                backoff_factor=HTTP_BACKOFF_FACTOR,
+                status_forcelist=(500, 502, 503, 504),
+            ),
+        )
+        logger.info(f"MinIO client: {self._endpoint} bucket={self._bucket} (pool maxsize={POOL_MAXSIZE})")
+        return Minio(
+            self._endpoint,
+            access_key=self._access_key,
+            secret_key=self._secret_key,
+            secure=self._secure,
+            http_client=http_client,
+        )
 
     def upload(self, data: bytes, key: str, content_type: str = "image/jpeg") -> StorageRef:
-        # TODO: Implementar upload MinIO
-        raise NotImplementedError
+        # BytesIO sobre bytes imutáveis compartilha o buffer (sem memcpy do payload)
+        self._client.put_object(
+            self._bucket,
+            key,
+            io.BytesIO(data),
+            length=len(data),
+            content_type=content_type,
+            part_size=MULTIPART_PART_SIZE,
+        )
+        return StorageRef(
+            bucket=self._bucket,
+            key=key,
+            size_bytes=len(data),
+            sha256=hashlib.sha256(data).hexdigest(),
+            content_type=content_type,
+        )
+
+    def upload_many(self, items: List[Tuple[bytes, str, str]]) -> List[StorageRef]:
+        """
+        Upload concorrente de vários arquivos.
+
+        Args:
+            items: Tuplas (data, key, content_type).
+
+        Returns:
+            StorageRefs na mesma ordem de `items`. A primeira falha é propagada.
+        """
+        return list(self._pool.map(lambda item: self.upload(*item), items))
 
     def download(self, key: str) -> bytes:
-        # TODO: Implementar download MinIO
-        raise NotImplementedError
+        response = self._client.get_object(self._bucket, key)
+        try:
+            return response.read()
+        finally:
+            # Devolve a conexão ao pool
+            response.close()
+            response.release_conn()
 
     def get_url(self, key: str, expires_seconds: int = 3600) -> str:
-        # TODO: Gerar presigned URL
-        raise NotImplementedError
+        return self._client.presigned_get_object(
+            self._bucket, key, expires=timedelta(seconds=expires_seconds)
+        )
+
+    def close(self):
+        """Encerra o pool de uploads (aguarda os pendentes)."""
+        self._pool.shutdown(wait=True)
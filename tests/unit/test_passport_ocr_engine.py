@@ -0,0 +1,70 @@
+"""Tests para a montagem do OCRResult no PassportOCREngine (sem PaddleOCR)."""
+
+import numpy as np
+
+from src.core.interfaces.ocr_engine import OCRField, OCRResult
+from src.infrastructure.data.coco_loader import FieldRegion, PassportSample
+from src.infrastructure.ocr.passport_ocr_engine import PassportOCREngine
+
+
+class _FakeRecognizer:
+    """Responde como PaddleOCR 2.x com det=False: [[(texto, confiança), ...]]."""
+
+    def __init__(self, texts):
+        self._texts = texts
+
+    def ocr(self, img, det=True, cls=True):
+        return [[(text, 0.9) for text in self._texts[:len(img[0])]]]
+
+
+def _engine(recognizer=None) -> PassportOCREngine:
+    engine = PassportOCREngine(region_workers=0)
+    engine._ocr = recognizer
+    engine._initialized = True  # não carrega PaddleOCR
+    return engine
+
+
+def _region(name: str, x: float) -> FieldRegion:
+    return FieldRegion(field_name=name, category_id=1, bbox=(x, 10.0, 40.0, 20.0), area=800.0)
+
+
+def test_build_region_result_uses_ocr_result_fields():
+    metas = [("surname", [0, 0, 10, 10]), ("surname", [20, 0, 30, 10]), ("sex", [0, 20, 10, 30])]
+    result = _engine()._build_region_result(metas, [("ERIKSSON", 0.8), ("ANNA", 0.6), ("f", 1.0)])
+
+    assert isinstance(result, OCRResult)
+    assert result.doc_type_detected == "passport"
+    assert result.avg_confidence == 0.8
+    assert result.details["extracted_fields"] == {"surname": "ERIKSSON ANNA", "sex": "F"}
+    assert result.fields[0] == OCRField("surname", "ERIKSSON", 0.8, bounding_box=[0, 0, 10, 10])
+    assert "sex: F" in result.raw_text
+
+
+def test_build_region_result_skips_empty_text():
+    result = _engine()._build_region_result([("surname", [0, 0, 10, 10])], [("", 0.0)])
+
+    assert result.fields == []
+    assert result.avg_confidence == 0.0
+    assert result.details["extracted_fields"] == {}
+
+
+def test_extract_with_regions_end_to_end():
+    sample = PassportSample(
+        image_id=1, file_name="x.jpg", original_name="x.jpg", width=200, height=100,
+        country_code="aze",
+        fields={"document_number": [_region("document_number", 10.0)], "sex": [_region("sex", 100.0)]},
+    )
+    engine = _engine(_FakeRecognizer(["C 01 X", "m"]))
+
+    result = engine.extract_with_regions(np.zeros((100, 200, 3), dtype=np.uint8), sample)
+
+    assert result.field_values == {"document_number": "C01X", "sex": "M"}
+    assert result.avg_confidence == 0.9
+
+
+def test_full_image_without_paddle_returns_empty_result():
+    result = _engine()._ocr_full_image(np.zeros((10, 10, 3), dtype=np.uint8))
+
+    assert result.fields == []
+    assert result.raw_text == "[PaddleOCR not available]"
+    assert result.details["extracted_fields"] == {}